@@ -0,0 +1,93 @@
+"""
+In-memory stand-in for the parts of gspread that data_processing.py uses.
+
+Every call is recorded on the client so a benchmark can report how many API
+round-trips a run would have made and how large the update payloads were,
+without touching Google.
+"""
+import json
+from collections import Counter
+
+import gspread
+
+
+class FakeWorksheet:
+    def __init__(self, client, title, records=None):
+        self._client = client
+        self.title = title
+        self.values = []
+        self._records = records or []
+
+    def clear(self):
+        self._client.record('worksheet.clear')
+        self.values = []
+
+    def update(self, values, *args, **kwargs):
+        # gspread sends values as plain JSON, so datetimes and other non-JSON
+        # cells raise here just like the real client, before any call is made
+        payload = json.dumps(values)
+        cells = sum(len(row) for row in values)
+        self._client.record('worksheet.update', payload_bytes=len(payload), cells=cells)
+        self.values = values
+
+    def get_all_records(self):
+        self._client.record('worksheet.get_all_records')
+        return list(self._records)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, worksheets=None):
+        self._client = client
+        self._worksheets = {}
+        for title, records in (worksheets or {}).items():
+            self._worksheets[title] = FakeWorksheet(client, title, records)
+
+    def worksheet(self, title):
+        self._client.record('spreadsheet.worksheet')
+        try:
+            return self._worksheets[title]
+        except KeyError:
+            raise gspread.exceptions.WorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows, cols):
+        self._client.record('spreadsheet.add_worksheet')
+        ws = FakeWorksheet(self._client, title)
+        self._worksheets[title] = ws
+        return ws
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+
+class FakeClient:
+    """Replacement for the object returned by gspread.authorize()"""
+
+    def __init__(self, imp_commitment_records=None):
+        self.calls = Counter()
+        self.payload_bytes = 0
+        self.cells = 0
+        self.target = FakeSpreadsheet(self)
+        self.imp_commitment = FakeSpreadsheet(
+            self, {'Impression_Commitment': imp_commitment_records or []}
+        )
+
+    def record(self, name, payload_bytes=0, cells=0):
+        self.calls[name] += 1
+        self.payload_bytes += payload_bytes
+        self.cells += cells
+
+    def open_by_url(self, url):
+        self.record('client.open_by_url')
+        return self.target
+
+    def open_by_key(self, key):
+        self.record('client.open_by_key')
+        return self.imp_commitment
+
+    def stats(self):
+        return {
+            'api_calls': sum(self.calls.values()),
+            'calls': dict(self.calls),
+            'payload_bytes': self.payload_bytes,
+            'cells': self.cells,
+        }
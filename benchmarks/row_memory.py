@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare memory and time of the Sheet2/Final_Innov_Details rows: the compact
+records in compact_rows.py against the list-of-lists rows the pipeline used
+before. Reports retained bytes per 100k rows, measured with tracemalloc.
+
+    python -m benchmarks.row_memory --rows 100000
+"""
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import data_processing as dp
+from benchmarks.synthetic_workbook import generate_workbook
+from diagnostics import Diagnostics
+
+
+def legacy_sheet2(data_rows, data_headers, configs_lookup, configs_headers):
+    """Sheet2 as list-of-lists, built the way the pipeline used to"""
+    rows = []
+    pkg_name_idx = configs_headers.index('Package Name')
+    for data_row in data_rows:
+        pkg_id = dp.norm_pkgid(data_row[data_headers.index('Package ID')])
+        base = [data_row[data_headers.index(h)] for h in ('Expresso ID', 'Campaign Name')]
+        tail = [data_row[data_headers.index(h)] for h in ('Advertiser', 'Brand', 'Geo Name')]
+        if pkg_id in configs_lookup:
+            for config_row in configs_lookup[pkg_id]:
+                rows.append(base + [pkg_id, config_row[pkg_name_idx]] + tail + [
+                    config_row[configs_headers.index(h)]
+                    for h in ('Website', 'Section', 'Ad Unit Type', 'Placement')
+                ])
+        else:
+            rows.append(base + [pkg_id, ''] + tail + ['', '', '', ''])
+    return rows
+
+
+def legacy_final(sheet2_rows, imp_lookup):
+    """Final_Innov_Details as list-of-lists with the two in-place Imp. Commitment passes"""
+    final_rows = []
+    for row in sheet2_rows:
+        ad_unit_type = row[9] or ''
+        portal, platform = dp.parse_portal_platform(row[7])
+        if ad_unit_type.startswith('TIL_'):
+            ad_unit_type = ad_unit_type[4:]
+        final_rows.append([
+            row[0], row[1], row[2], row[3], '', row[5], row[6], platform, portal, row[8], ad_unit_type, row[10]
+        ])
+    for i, row in enumerate(final_rows):
+        final_rows[i][4] = imp_lookup.get((dp.norm_pkgid(row[2]), str(row[6]).strip()), '')
+    seen = set()
+    for i, row in enumerate(final_rows):
+        key = (row[2], row[6])
+        if key in seen:
+            final_rows[i][4] = ''
+        else:
+            seen.add(key)
+    return final_rows
+
+
+def measure(build):
+    """Return (result, retained bytes, seconds) for one build"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Row representation memory per 100k rows')
+    parser.add_argument('--rows', type=int, default=30000, help='Data rows in the synthetic workbook')
+    parser.add_argument('--workdir', default=os.getenv('BENCH_WORKDIR', '/tmp/innov_bench'))
+    args = parser.parse_args(argv)
+
+    path = os.path.join(args.workdir, f'row_memory_{args.rows}.xlsx')
+    if not os.path.exists(path):
+        generate_workbook(path, rows=args.rows)
+
+    diag = Diagnostics(verbosity=0)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        book = dp.BookingWorkbook(path)
+        lookup = dp.build_configs_lookup(book.configs_rows, book.configs_headers)
+        # Every Package ID + Geo Name gets a commitment so the merge does full work
+        imp_lookup = {(pkg_id, geo): 1000 for pkg_id in lookup for geo in
+                      {str(r[book.data_headers.index('Geo Name')]).strip() for r in book.data_rows[:200]}}
+
+        stages = {}
+        old_sheet2, b, t = measure(lambda: legacy_sheet2(
+            book.data_rows, book.data_headers, lookup, book.configs_headers))
+        stages['Sheet2 list-of-lists'] = (len(old_sheet2), b, t)
+        old_final, b, t = measure(lambda: legacy_final(old_sheet2, imp_lookup))
+        stages['Final list-of-lists'] = (len(old_final), b, t)
+        del old_sheet2, old_final
+
+        sheet2, b, t = measure(lambda: dp.build_sheet2(
+            book.data_rows, book.data_headers, lookup, book.configs_headers, diag))
+        stages['Sheet2 compact'] = (len(sheet2), b, t)
+        final, b, t = measure(lambda: dp.build_final_rows(sheet2, imp_lookup, diag))
+        stages['Final compact'] = (len(final), b, t)
+
+    print(f"{'stage':24} {'rows':>9} {'MB/100k rows':>13} {'s/100k rows':>12}")
+    for name, (n, retained, elapsed) in stages.items():
+        scale = 100_000 / max(n, 1)
+        print(f"{name:24} {n:>9} {retained * scale / 2**20:>13.1f} {elapsed * scale:>12.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
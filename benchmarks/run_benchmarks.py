@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark data_processing.process() end to end on synthetic workbooks.
+
+Each size runs in a fresh subprocess so peak RSS belongs to that run alone.
+Google Sheets is replaced by benchmarks.fake_gspread, so the numbers cover
+workbook load, processing and payload building but no network time.
+
+    python -m benchmarks.run_benchmarks                       # 1k, 10k, 100k, 1M
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 --json bench.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import data_processing
+from benchmarks.fake_gspread import FakeClient
+from benchmarks.synthetic_workbook import (
+    generate_imp_commitment_records,
+    generate_workbook,
+    package_catalogue,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def workbook_path(workdir, rows, args):
+    name = (
+        f'booking_{rows}_ppb{args.packages_per_booking}_cpp{args.configs_per_package}'
+        f'_hb{args.hb_ratio}_phb{args.phb_ratio}_ff{args.ffill_sparsity}_s{args.seed}.xlsx'
+    )
+    return os.path.join(workdir, name)
+
+
+def ensure_workbook(path, rows, args):
+    """Generate the workbook unless an identical one is already cached"""
+    if os.path.exists(path):
+        return
+    print(f"🔄 Generating {rows} row workbook at {path}...", flush=True)
+    generate_workbook(
+        path,
+        rows=rows,
+        packages_per_booking=args.packages_per_booking,
+        configs_per_package=args.configs_per_package,
+        hb_ratio=args.hb_ratio,
+        phb_ratio=args.phb_ratio,
+        ffill_sparsity=args.ffill_sparsity,
+        seed=args.seed,
+    )
+
+
+def run_single(path, rows, args):
+    """Run the pipeline once in this process and return its measurements"""
+    packages = package_catalogue(rows, args.packages_per_booking, args.seed)
+    client = FakeClient(generate_imp_commitment_records(packages, seed=args.seed))
+
+    # Each benchmark run appends to a fresh history store in the workdir
+    history_db = os.path.join(args.workdir, f'history_{rows}.sqlite')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(history_db + suffix):
+            os.remove(history_db + suffix)
+    os.environ['OUTBOX_DB'] = os.path.join(args.workdir, 'notification_outbox.sqlite')
+    config = data_processing.PipelineConfig(
+        excel_path=path,
+        output_sink=args.sink,
+        output_path=os.path.join(args.workdir, f'output_{rows}_{args.sink}'),
+        history_db=history_db,
+        notify_outbox=True,
+    )
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        data_processing.process(config, gc=client)
+        elapsed = time.perf_counter() - start
+
+    result = {
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        # ru_maxrss is reported in KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'rss_growth_mb': round(
+            (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1
+        ),
+    }
+    if args.tracemalloc:
+        result['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    result.update(client.stats())
+    return result
+
+
+def run_size(rows, args):
+    """Run one size in a subprocess and return its parsed result"""
+    path = workbook_path(args.workdir, rows, args)
+    ensure_workbook(path, rows, args)
+    cmd = [sys.executable, '-m', 'benchmarks.run_benchmarks', '--single', str(rows)]
+    cmd += forwarded_args(args)
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        raise RuntimeError(f"Benchmark for {rows} rows failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def forwarded_args(args):
+    forwarded = [
+        '--workdir', args.workdir,
+        '--packages-per-booking', str(args.packages_per_booking),
+        '--configs-per-package', str(args.configs_per_package),
+        '--hb-ratio', str(args.hb_ratio),
+        '--phb-ratio', str(args.phb_ratio),
+        '--ffill-sparsity', str(args.ffill_sparsity),
+        '--seed', str(args.seed),
+        '--sink', args.sink,
+    ]
+    if args.tracemalloc:
+        forwarded.append('--tracemalloc')
+    return forwarded
+
+
+def print_table(results):
+    print(f"{'rows':>10} {'seconds':>9} {'peak MB':>9} {'API calls':>10} {'updates':>8} "
+          f"{'cells':>12} {'payload MB':>11}")
+    for r in results:
+        print(f"{r['rows']:>10} {r['seconds']:>9} {r['peak_rss_mb']:>9} {r['api_calls']:>10} "
+              f"{r['calls'].get('worksheet.update', 0):>8} {r['cells']:>12} "
+              f"{r['payload_bytes'] / 2**20:>11.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark data_processing.py on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Data row counts to benchmark')
+    parser.add_argument('--workdir', default=os.getenv('BENCH_WORKDIR', '/tmp/innov_bench'),
+                        help='Where generated workbooks are cached')
+    parser.add_argument('--json', help='Append one JSON line per size to this file')
+    parser.add_argument('--label', default='', help='Tag stored with each JSON result')
+    parser.add_argument('--packages-per-booking', type=int, default=3)
+    parser.add_argument('--configs-per-package', type=int, default=4)
+    parser.add_argument('--hb-ratio', type=float, default=0.6)
+    parser.add_argument('--phb-ratio', type=float, default=0.2)
+    parser.add_argument('--ffill-sparsity', type=float, default=0.8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sink', default='gsheet', choices=['gsheet', 'xlsx', 'csv', 'parquet'],
+                        help='Output sink to benchmark (gsheet uses the fake client)')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Also report the Python heap peak (slows the run down)')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.single is not None:
+        path = workbook_path(args.workdir, args.single, args)
+        print(json.dumps(run_single(path, args.single, args)))
+        return 0
+
+    results = []
+    for rows in args.sizes:
+        result = run_size(rows, args)
+        result['label'] = args.label
+        result['sink'] = args.sink
+        result['timestamp'] = datetime.now().isoformat(timespec='seconds')
+        results.append(result)
+        print(f"✅ {rows} rows: {result['seconds']}s, {result['peak_rss_mb']} MB peak, "
+              f"{result['api_calls']} API calls", flush=True)
+        if args.json:
+            with open(args.json, 'a') as f:
+                f.write(json.dumps(result) + '\n')
+
+    print()
+    print_table(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
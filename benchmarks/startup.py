@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Measure CLI startup: wall time to import each entry point in a fresh
+interpreter, and which heavy dependencies that import drags in.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['selenium', 'webdriver_manager', 'gspread', 'google.oauth2', 'openpyxl', 'pyarrow']
+
+# What each subcommand imports before it starts doing real work
+ENTRY_POINTS = {
+    'python (baseline)': 'pass',
+    'innov.py --help': 'import innov; innov.parse_args(["process", "--sink", "csv"])',
+    'download (main)': 'import innov, main',
+    'process (data_processing)': 'import innov, data_processing',
+    'process --sink csv (workbook read)': 'import innov, data_processing, openpyxl',
+    'process/upload --sink gsheet': 'import innov, data_processing, openpyxl, gspread, google.oauth2.service_account',
+    'notify (send_email)': 'import innov, send_email',
+}
+
+
+def time_import(code, repeat):
+    probe = f'{code}\nimport sys\nprint(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    timings = []
+    loaded = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', probe], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - start)
+        loaded = proc.stdout.strip()
+    return statistics.median(timings), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure entry point import time')
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(f"{'entry point':38} {'median ms':>10}  heavy modules loaded")
+    for name, code in ENTRY_POINTS.items():
+        seconds, loaded = time_import(code, args.repeat)
+        print(f"{name:38} {seconds * 1000:>10.0f}  {loaded or '-'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
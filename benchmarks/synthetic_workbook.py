@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic BookingData.xlsx workbooks shaped like the Expresso export.
+
+The workbook has the same 'Data' and 'Configs' sheets that data_processing.py
+reads, with knobs for the things that drive its cost: row count, packages per
+booking, the HB/PHB mix, config fan-out and how sparse the Package ID/Name
+columns are in Configs (the forward-fill case).
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+import openpyxl
+
+DATA_HEADERS = [
+    'Expresso ID', 'Campaign Name', 'Package ID', 'Package Name', 'Advertiser',
+    'Brand', 'Geo Name', 'Booking Type', 'Start Date', 'End Date',
+    'Booked Impressions', 'Rate', 'Status'
+]
+CONFIGS_HEADERS = [
+    'Package ID', 'Package Name', 'Website', 'Section', 'Ad Unit Type', 'Placement'
+]
+
+ET_LANGUAGES = ['Gujarati', 'Hindi', 'Marathi', 'Kannada', 'Bengali', 'Tamil', 'Telugu', 'Malayalam']
+PUBLISHERS = [
+    'Times of India', 'Economic Times', 'Navbharat Times', 'Maharashtra Times',
+    'Vijay Karnataka', 'ETRealty', 'ETCIO', 'ETBrandEquity', 'Filmfare', 'Femina'
+]
+PLATFORM_SUFFIXES = [
+    'Website', 'Mobile Website', 'Mobile Site', 'Mweb', 'Android App', 'Android Apps',
+    'iOS App', 'IOS Apps', 'AOS', 'Web', 'Mobile'
+]
+SPECIAL_WEBSITES = ['E-TIMES WEBSITE']
+SECTIONS = ['Home', 'ROS', 'Business', 'Markets', 'Entertainment', 'Sports', 'Tech', 'Auto', 'Lifestyle']
+AD_UNIT_TYPES = [
+    'TIL_Bottom Overlay', 'TIL_Interstitial', 'TIL_Skin', 'TIL_Native', 'TIL_Video Preroll',
+    'Masthead', 'Top Banner', 'In-Article'
+]
+PLACEMENTS = ['ATF', 'BTF', 'Sticky', 'Inline', 'Popup']
+PACKAGE_NAME_STEMS = [
+    'ETRealty Spotlight', 'ETCIO Leaders', 'ET Auto Drive', 'ET Hindi Reach',
+    'ET Marathi Reach', 'ET B2B Combo', 'DAVP Campaign', 'TOI Premium',
+    'NBT Regional', 'Times Lifestyle', 'ET_Telugu Boost', 'Filmfare Buzz'
+]
+GEO_NAMES = [
+    'India', 'Mumbai', 'Delhi NCR', 'Bengaluru', 'Chennai', 'Kolkata', 'Hyderabad',
+    'Pune', 'Ahmedabad', 'Rest of Maharashtra', 'Tier 2 Cities'
+]
+ADVERTISERS = [
+    'Acme Motors', 'Zenith Bank', 'Nova Realty', 'Orbit Telecom', 'Kite Foods',
+    'Summit Insurance', 'Lotus Apparel', 'Vertex Cloud'
+]
+OTHER_BOOKING_TYPES = ['Standard', 'Sponsorship', 'Barter', 'PG']
+
+
+def random_website(rng, amp_ratio=0.1, special_ratio=0.01):
+    """Return a Website string covering the formats parse_portal_platform handles"""
+    roll = rng.random()
+    if roll < special_ratio:
+        return rng.choice(SPECIAL_WEBSITES)
+    if rng.random() < 0.35:
+        lang = rng.choice(ET_LANGUAGES)
+        stem = f'ET {lang}' if rng.random() < 0.7 else f'ET_{lang}'
+    else:
+        stem = rng.choice(PUBLISHERS)
+    if rng.random() < amp_ratio:
+        return f'{stem} {rng.choice(["AMP", "Amp", "amp"])}'
+    if rng.random() < 0.05:
+        # No platform identifier at all; the parser falls back to the whole string
+        return stem
+    return f'{stem} {rng.choice(PLATFORM_SUFFIXES)}'
+
+
+def package_catalogue(rows, packages_per_booking=3, seed=42):
+    """Return the (Package ID, Package Name) pairs a workbook of this size uses"""
+    rng = random.Random(seed)
+    n_packages = max(1, rows // max(1, packages_per_booking * 4))
+    return [(100000 + n, f'{rng.choice(PACKAGE_NAME_STEMS)} {n}') for n in range(n_packages)]
+
+
+def generate_workbook(path, rows=1000, packages_per_booking=3, configs_per_package=4,
+                      hb_ratio=0.6, phb_ratio=0.2, ffill_sparsity=0.8,
+                      unmatched_ratio=0.02, amp_ratio=0.1, special_ratio=0.01,
+                      seed=42):
+    """
+    Write a synthetic booking workbook to `path` and return the package catalogue.
+
+    rows                  number of rows in the 'Data' sheet
+    packages_per_booking  Data rows sharing one Expresso ID (one per package line)
+    configs_per_package   'Configs' rows each package fans out to
+    hb_ratio, phb_ratio   share of Data rows with Booking Type HB / PHB
+    ffill_sparsity        chance a follow-up Configs row leaves Package ID/Name blank
+    unmatched_ratio       share of Data rows whose Package ID has no Configs rows
+    """
+    packages = package_catalogue(rows, packages_per_booking, seed)
+    rng = random.Random(seed + 1)
+
+    wb = openpyxl.Workbook(write_only=True)
+
+    data_ws = wb.create_sheet('Data')
+    data_ws.append(DATA_HEADERS)
+    start = datetime(2025, 1, 1)
+    booking_no = 0
+    for i in range(rows):
+        if i % packages_per_booking == 0:
+            booking_no += 1
+            campaign = f'Campaign {booking_no} - {rng.choice(ADVERTISERS)}'
+            advertiser = rng.choice(ADVERTISERS)
+            brand = f'{advertiser.split()[0]} {rng.choice(["Prime", "Go", "Plus", "One"])}'
+        if rng.random() < unmatched_ratio:
+            pkg_id, pkg_name = 900000 + rng.randrange(10000), 'Unmapped Package'
+        else:
+            pkg_id, pkg_name = rng.choice(packages)
+        roll = rng.random()
+        if roll < hb_ratio:
+            booking_type = 'HB'
+        elif roll < hb_ratio + phb_ratio:
+            booking_type = 'PHB'
+        else:
+            booking_type = rng.choice(OTHER_BOOKING_TYPES)
+        day = start + timedelta(days=rng.randrange(365))
+        data_ws.append([
+            f'EXP-{booking_no:07d}',
+            campaign,
+            # Expresso exports numeric IDs as floats, sometimes as text
+            float(pkg_id) if rng.random() < 0.7 else str(pkg_id),
+            pkg_name,
+            advertiser,
+            brand,
+            rng.choice(GEO_NAMES),
+            booking_type,
+            day,
+            day + timedelta(days=rng.randrange(1, 30)),
+            rng.randrange(10, 5000) * 1000,
+            round(rng.uniform(20, 400), 2),
+            rng.choice(['Booked', 'Live', 'Paused']),
+        ])
+
+    configs_ws = wb.create_sheet('Configs')
+    configs_ws.append(CONFIGS_HEADERS)
+    for pkg_id, pkg_name in packages:
+        for j in range(configs_per_package):
+            blank = j > 0 and rng.random() < ffill_sparsity
+            configs_ws.append([
+                None if blank else float(pkg_id),
+                None if blank else pkg_name,
+                random_website(rng, amp_ratio, special_ratio),
+                rng.choice(SECTIONS),
+                rng.choice(AD_UNIT_TYPES),
+                rng.choice(PLACEMENTS),
+            ])
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    wb.save(path)
+    return packages
+
+
+def generate_imp_commitment_records(packages, coverage=0.5, seed=42):
+    """Build get_all_records()-style rows for the Impression_Commitment sheet"""
+    rng = random.Random(seed)
+    records = []
+    for pkg_id, _ in packages:
+        if rng.random() >= coverage:
+            continue
+        for geo in rng.sample(GEO_NAMES, 3):
+            records.append({
+                'Til_Package_Id__c': f'{pkg_id}.0' if rng.random() < 0.5 else pkg_id,
+                'Geo__c': geo,
+                'Geo_Level_Imp__c': rng.randrange(100, 10000) * 1000,
+            })
+    return records
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate a synthetic BookingData.xlsx')
+    parser.add_argument('path', help='Output .xlsx path')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--packages-per-booking', type=int, default=3)
+    parser.add_argument('--configs-per-package', type=int, default=4)
+    parser.add_argument('--hb-ratio', type=float, default=0.6)
+    parser.add_argument('--phb-ratio', type=float, default=0.2)
+    parser.add_argument('--ffill-sparsity', type=float, default=0.8)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    generate_workbook(
+        args.path,
+        rows=args.rows,
+        packages_per_booking=args.packages_per_booking,
+        configs_per_package=args.configs_per_package,
+        hb_ratio=args.hb_ratio,
+        phb_ratio=args.phb_ratio,
+        ffill_sparsity=args.ffill_sparsity,
+        seed=args.seed,
+    )
+    print(f"✅ Wrote {args.rows} Data rows to {args.path}")
@@ -0,0 +1,46 @@
+"""
+Compact row records for the Sheet2 and Final_Innov_Details stages.
+
+A booking fans out to every config row of its package, so the same strings
+(Campaign Name, Brand, Website, Section, ...) appear in thousands of rows.
+The records are namedtuples: fixed-size, no per-row __dict__, and indexable
+like the lists they replace, so the sort, serializer and diagnostics code works
+unchanged. Strings the stages derive per row (normalized Package IDs,
+Publisher, stripped Ad Unit Type) are interned so repeats share one object.
+"""
+import sys
+from collections import namedtuple
+
+Sheet2Row = namedtuple('Sheet2Row', [
+    'expresso_id', 'campaign_name', 'package_id', 'package_name', 'advertiser',
+    'brand', 'geo_name', 'website', 'section', 'ad_unit_type', 'placement',
+])
+
+FinalRow = namedtuple('FinalRow', [
+    'expresso_id', 'campaign_name', 'package_id', 'package_name', 'imp_commitment',
+    'brand', 'geo_name', 'platform', 'publisher', 'section', 'ad_unit_type', 'placement',
+])
+
+intern = sys.intern
+
+
+class InternCache(dict):
+    """
+    Memoize a str-returning function per distinct input and intern its result,
+    e.g. InternCache(normalize_id) for Package IDs.
+    """
+
+    __slots__ = ('func',)
+
+    def __init__(self, func):
+        super().__init__()
+        self.func = func
+
+    def __missing__(self, key):
+        value = self.func(key)
+        if type(value) is str:
+            value = intern(value)
+        elif type(value) is tuple:
+            value = tuple(intern(v) if type(v) is str else v for v in value)
+        self[key] = value
+        return value
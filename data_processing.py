@@ -1,131 +1,208 @@
-import openpyxl
-import gspread
-from google.oauth2.service_account import Credentials
+"""
+Process the Expresso booking workbook into the Innovation sheet tabs.
+
+The stages are plain functions so they can be reused, benchmarked and run
+in-process; process() chains them the way the scheduled job does. Heavy
+dependencies (openpyxl, gspread, google-auth) are imported only by the
+stages that need them.
+
+    python data_processing.py        # same as `python innov.py process`
+"""
 from collections import defaultdict
+from datetime import datetime, timedelta
 import os
+import sys
+import time
+from output_sinks import create_sink
+from diagnostics import Diagnostics
+from sheet_schema import compile_serializer, normalize_id
+from compact_rows import FinalRow, InternCache, Sheet2Row
 
 # === CONFIGURATION ===
-EXCEL_PATH = os.getenv('EXCEL_PATH', '/tmp/BookingData_folder/BookingData.xlsx')
-SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE', '/tmp/service-account.json')
-GSHEET_URL = os.getenv('GSHEET_URL', 'https://docs.google.com/spreadsheets/d/1dp5WINj0Urrvk8Ul2rR_q6HDzjdeAp7iuw5IsY3J3f8/edit#gid=0')
+DEFAULT_EXCEL_PATH = '/tmp/BookingData_folder/BookingData.xlsx'
+DEFAULT_SERVICE_ACCOUNT_FILE = '/tmp/service-account.json'
+DEFAULT_GSHEET_URL = 'https://docs.google.com/spreadsheets/d/1dp5WINj0Urrvk8Ul2rR_q6HDzjdeAp7iuw5IsY3J3f8/edit#gid=0'
 IMP_COMMITMENT_GSHEET_URL = 'https://docs.google.com/spreadsheets/d/1b3VxcaWYkxlBdJlpxefCk4r816eaQl56By2NJlorEQw/edit?gid=667901590#gid=667901590'
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
 
-# === 1. Read all sheets ===
-wb = openpyxl.load_workbook(EXCEL_PATH, data_only=True)
-data_ws = wb['Data']
-configs_ws = wb['Configs']
-
-def get_headers(ws):
-    return [str(cell.value).strip() for cell in ws[1]]
+# Explicitly set the expected column names (update these if your sheet uses different names)
+IMP_PKGID_COL = 'Til_Package_Id__c'  # or whatever the actual column name is
+IMP_GEONAME_COL = 'Geo__c'           # or whatever the actual column name is
+IMP_VAL_COL = 'Geo_Level_Imp__c'   # or whatever the actual column name is
 
-data_headers = get_headers(data_ws)
-configs_headers = get_headers(configs_ws)
+# Websites worth flagging in the diagnostics report
+SPECIAL_WEBSITES = {'E-TIMES WEBSITE'}
 
-# Filter Data for HB/PHB
-booking_type_idx = data_headers.index('Booking Type')
-data_rows = [
-    [cell.value for cell in row]
-    for row in data_ws.iter_rows(min_row=2)
-    if row[booking_type_idx].value in ('HB', 'PHB')
+SHEET2_HEADERS = [
+    'Expresso ID', 'Campaign Name', 'Package ID', 'Package Name', 'Advertiser',
+    'Brand', 'Geo Name', 'Website', 'Section', 'Ad Unit Type', 'Placement'
+]
+FINAL_HEADERS = [
+    'Expresso ID', 'Campaign Name', 'Package ID', 'Package Name', 'Imp. Commitment',
+    'Brand', 'Geo Name', 'Platform', 'Publisher', 'Section', 'Ad Unit Type', 'Placement'
+]
+OUTPUT_TABS = [
+    'Data', 'Configs', 'Config2', 'Sheet2', 'Final_Innov_Details',
+    'Final_Innov_Details_sorted', 'Final_Innov_Details_sorted| For Ops Reference'
 ]
 
-# Forward-fill Package ID/Name in Configs
-pkg_id_idx = configs_headers.index('Package ID')
-pkg_name_idx = configs_headers.index('Package Name')
-configs_rows = []
-last_pkg_id = last_pkg_name = None
-for row in configs_ws.iter_rows(min_row=2):
-    row_values = [cell.value for cell in row]
-    if row_values[pkg_id_idx] is not None:
-        last_pkg_id = row_values[pkg_id_idx]
-    else:
-        row_values[pkg_id_idx] = last_pkg_id
-    if row_values[pkg_name_idx] is not None:
-        last_pkg_name = row_values[pkg_name_idx]
-    else:
-        row_values[pkg_name_idx] = last_pkg_name
-    configs_rows.append(row_values)
+
+class PipelineConfig:
+    """Settings for one run; from_env() reads the variables the workflow sets"""
+
+    def __init__(self, excel_path=DEFAULT_EXCEL_PATH, service_account_file=DEFAULT_SERVICE_ACCOUNT_FILE,
+                 gsheet_url=DEFAULT_GSHEET_URL, output_sink='gsheet', output_path='output',
+                 sheet_date_format='iso', history_db='history/innov_history.sqlite',
+                 target_date=None, notify_outbox=None):
+        self.excel_path = excel_path
+        self.service_account_file = service_account_file
+        self.gsheet_url = gsheet_url
+        # Where the processed tabs go: gsheet (default), xlsx, csv or parquet
+        self.output_sink = output_sink.lower()
+        # File/directory for local sinks; strftime codes allowed, e.g. archive/%Y%m%d_%H%M%S
+        self.output_path = output_path
+        # How dates are written to the output tabs: iso (YYYY-MM-DD) or serial (spreadsheet day numbers)
+        self.sheet_date_format = sheet_date_format.lower()
+        # Local SQLite history of every run's Final_Innov_Details rows; '' disables it
+        self.history_db = history_db
+        # Bookings are downloaded for tomorrow (see main.py)
+        self.target_date = target_date or (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        # Queue the notification email (sent later by send_email.py --flush); on by default for Sheets runs
+        self.notify_outbox = self.output_sink == 'gsheet' if notify_outbox is None else notify_outbox
+
+    @classmethod
+    def from_env(cls, **overrides):
+        notify = os.getenv('NOTIFY_OUTBOX')
+        settings = dict(
+            excel_path=os.getenv('EXCEL_PATH', DEFAULT_EXCEL_PATH),
+            service_account_file=os.getenv('SERVICE_ACCOUNT_FILE', DEFAULT_SERVICE_ACCOUNT_FILE),
+            gsheet_url=os.getenv('GSHEET_URL', DEFAULT_GSHEET_URL),
+            output_sink=os.getenv('OUTPUT_SINK', 'gsheet'),
+            output_path=os.getenv('OUTPUT_PATH', 'output'),
+            sheet_date_format=os.getenv('SHEET_DATE_FORMAT', 'iso'),
+            history_db=os.getenv('HISTORY_DB', 'history/innov_history.sqlite'),
+            target_date=os.getenv('TARGET_DATE'),
+            notify_outbox=None if notify is None else notify == '1',
+        )
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**settings)
+
+
+class RunSummary:
+    """Per-stage lines (counts and timings) for the notification email"""
+
+    def __init__(self):
+        self.lines = []
+        self._stage_start = time.perf_counter()
+
+    def stage_done(self, name, detail):
+        now = time.perf_counter()
+        self.lines.append(f"{name}: {detail} ({now - self._stage_start:.1f}s)")
+        self._stage_start = now
+
 
 # Normalize Package IDs (float->int->str)
-def norm_pkgid(val):
-    try:
-        return str(int(float(val))).strip()
-    except:
-        return str(val).strip()
+norm_pkgid = normalize_id
 
 def norm_pkgname(val):
     return str(val).strip().lower() if val is not None else ''
 
-# Build lookup for configs by Package ID
-configs_lookup = defaultdict(list)
-for row in configs_rows:
-    pkg_id = norm_pkgid(row[pkg_id_idx])
-    configs_lookup[pkg_id].append(row)
-
-# Debug: Print some sample configs data
-print(f"✅ Loaded {len(configs_rows)} config rows")
-print(f"✅ Found {len(configs_lookup)} unique package IDs in configs")
-sample_configs = list(configs_lookup.items())[:3]
-for pkg_id, configs in sample_configs:
-    print(f"Package ID '{pkg_id}' has {len(configs)} config rows")
-    for config in configs[:2]:  # Show first 2 configs per package
-        website = config[configs_headers.index('Website')]
-        ad_unit = config[configs_headers.index('Ad Unit Type')]
-        print(f"  - Website: '{website}', Ad Unit: '{ad_unit}'")
 
-# === 2. Build Sheet2 (expand Data by matching Configs) ===
-sheet2_headers = [
-    'Expresso ID', 'Campaign Name', 'Package ID', 'Package Name', 'Advertiser',
-    'Brand', 'Geo Name', 'Website', 'Section', 'Ad Unit Type', 'Placement'
-]
-sheet2_rows = []
-print(f"✅ Processing {len(data_rows)} data rows")
-for i, data_row in enumerate(data_rows):
-    pkg_id = norm_pkgid(data_row[data_headers.index('Package ID')])
-    if i < 3:  # Debug first 3 data rows
-        print(f"Data row {i+1}: Package ID '{pkg_id}'")
-    
-    if pkg_id in configs_lookup:
-        configs_for_pkg = configs_lookup[pkg_id]
-        if i < 3:  # Debug first 3 data rows
-            print(f"  Found {len(configs_for_pkg)} config rows for this package")
-            for j, config in enumerate(configs_for_pkg[:2]):  # Show first 2 configs
-                website = config[configs_headers.index('Website')]
-                ad_unit = config[configs_headers.index('Ad Unit Type')]
-                print(f"    Config {j+1}: Website='{website}', Ad Unit='{ad_unit}'")
-        
-        for config_row in configs_for_pkg:
-            combined_row = [
-                data_row[data_headers.index('Expresso ID')],
-                data_row[data_headers.index('Campaign Name')],
-                pkg_id,
-                config_row[pkg_name_idx],
-                data_row[data_headers.index('Advertiser')],
-                data_row[data_headers.index('Brand')],
-                data_row[data_headers.index('Geo Name')],
-                config_row[configs_headers.index('Website')],
-                config_row[configs_headers.index('Section')],
-                config_row[configs_headers.index('Ad Unit Type')],
-                config_row[configs_headers.index('Placement')],
-            ]
-            sheet2_rows.append(combined_row)
-    else:
-        if i < 3:  # Debug first 3 data rows
-            print(f"  ❌ No config found for Package ID '{pkg_id}'")
-        # If no config match, fill with blanks for config fields
-        combined_row = [
-            data_row[data_headers.index('Expresso ID')],
-            data_row[data_headers.index('Campaign Name')],
-            pkg_id,
-            '',
-            data_row[data_headers.index('Advertiser')],
-            data_row[data_headers.index('Brand')],
-            data_row[data_headers.index('Geo Name')],
-            '', '', '', ''
+# === 1. Read all sheets ===
+def get_headers(ws):
+    return [str(cell.value).strip() for cell in ws[1]]
+
+
+class BookingWorkbook:
+    """The 'Data' and 'Configs' sheets of BookingData.xlsx, filtered and forward-filled"""
+
+    def __init__(self, path):
+        import openpyxl
+
+        self.wb = openpyxl.load_workbook(path, data_only=True)
+        self.data_ws = self.wb['Data']
+        self.configs_ws = self.wb['Configs']
+        self.data_headers = get_headers(self.data_ws)
+        self.configs_headers = get_headers(self.configs_ws)
+
+        # Filter Data for HB/PHB
+        booking_type_idx = self.data_headers.index('Booking Type')
+        self.data_rows = [
+            [cell.value for cell in row]
+            for row in self.data_ws.iter_rows(min_row=2)
+            if row[booking_type_idx].value in ('HB', 'PHB')
         ]
-        sheet2_rows.append(combined_row)
 
-print(f"✅ Created {len(sheet2_rows)} Sheet2 rows")
+        # Forward-fill Package ID/Name in Configs
+        pkg_id_idx = self.configs_headers.index('Package ID')
+        pkg_name_idx = self.configs_headers.index('Package Name')
+        self.configs_rows = []
+        last_pkg_id = last_pkg_name = None
+        for row in self.configs_ws.iter_rows(min_row=2):
+            row_values = [cell.value for cell in row]
+            if row_values[pkg_id_idx] is not None:
+                last_pkg_id = row_values[pkg_id_idx]
+            else:
+                row_values[pkg_id_idx] = last_pkg_id
+            if row_values[pkg_name_idx] is not None:
+                last_pkg_name = row_values[pkg_name_idx]
+            else:
+                row_values[pkg_name_idx] = last_pkg_name
+            self.configs_rows.append(row_values)
+
+    def raw_rows(self, sheet_name):
+        """Unfiltered value rows of 'Data' or 'Configs' for the raw upload tabs"""
+        return self.wb[sheet_name].iter_rows(min_row=2, values_only=True)
+
+
+def build_configs_lookup(configs_rows, configs_headers):
+    """Build lookup for configs by Package ID"""
+    pkg_id_idx = configs_headers.index('Package ID')
+    pkg_ids = InternCache(norm_pkgid)
+    configs_lookup = defaultdict(list)
+    for row in configs_rows:
+        pkg_id = pkg_ids[row[pkg_id_idx]]
+        configs_lookup[pkg_id].append(row)
+    return configs_lookup
+
+
+# === 2. Build Sheet2 (expand Data by matching Configs) ===
+def build_sheet2(data_rows, data_headers, configs_lookup, configs_headers, diag):
+    expresso_idx, campaign_idx, data_pkg_idx, advertiser_idx, brand_idx, geo_idx = (
+        data_headers.index(h) for h in
+        ('Expresso ID', 'Campaign Name', 'Package ID', 'Advertiser', 'Brand', 'Geo Name')
+    )
+    pkg_name_idx, website_idx, section_idx, ad_unit_idx, placement_idx = (
+        configs_headers.index(h) for h in
+        ('Package Name', 'Website', 'Section', 'Ad Unit Type', 'Placement')
+    )
+    pkg_ids = InternCache(norm_pkgid)
+    sheet2_rows = []
+    append = sheet2_rows.append
+    print(f"✅ Processing {len(data_rows)} data rows")
+    for data_row in data_rows:
+        pkg_id = pkg_ids[data_row[data_pkg_idx]]
+        expresso_id = data_row[expresso_idx]
+        campaign = data_row[campaign_idx]
+        advertiser = data_row[advertiser_idx]
+        brand = data_row[brand_idx]
+        geo = data_row[geo_idx]
+        configs_for_pkg = configs_lookup.get(pkg_id)
+        if configs_for_pkg:
+            for config_row in configs_for_pkg:
+                append(Sheet2Row(
+                    expresso_id, campaign, pkg_id, config_row[pkg_name_idx], advertiser, brand, geo,
+                    config_row[website_idx], config_row[section_idx],
+                    config_row[ad_unit_idx], config_row[placement_idx],
+                ))
+        else:
+            diag.count('Package IDs with no config', pkg_id)
+            # If no config match, fill with blanks for config fields
+            append(Sheet2Row(expresso_id, campaign, pkg_id, '', advertiser, brand, geo, '', '', '', ''))
+
+    print(f"✅ Created {len(sheet2_rows)} Sheet2 rows")
+    return sheet2_rows
+
 
 # === 3. Build Final_Innov_Details (parse Website, rename Portal->Publisher, remove TIL_, etc.) ===
 def parse_portal_platform(website):
@@ -223,108 +300,104 @@ def parse_portal_platform(website):
             platform = 'Web'
     return portal, platform
 
-final_headers = [
-    'Expresso ID', 'Campaign Name', 'Package ID', 'Package Name', 'Imp. Commitment',
-    'Brand', 'Geo Name', 'Platform', 'Publisher', 'Section', 'Ad Unit Type', 'Placement'
-]
-final_rows = []
-print(f"✅ Processing {len(sheet2_rows)} Sheet2 rows for Final_Innov_Details")
-
-# Debug: Check for any E-TIMES WEBSITE entries
-etimes_website_count = 0
-etimes_website_rows = []
-
-for i, row in enumerate(sheet2_rows):
-    website = row[7]
-    ad_unit_type = row[9] or ''
-    
-    # Check for E-TIMES WEBSITE entries
-    if website == 'E-TIMES WEBSITE':
-        etimes_website_count += 1
-        etimes_website_rows.append((i+1, ad_unit_type))
-    
-    portal, platform = parse_portal_platform(website)
-    
-    # Check for Bottom Overlay entries
-    if ad_unit_type == 'TIL_Bottom Overlay':
-        print(f"🔍 Bottom Overlay Row {i+1}: Website='{website}' → Parsed: Publisher='{portal}', Platform='{platform}'")
-    
-    if i < 5:  # Debug first 5 rows
-        print(f"Row {i+1}: Website='{website}', Ad Unit='{ad_unit_type}'")
-        print(f"  Parsed: Publisher='{portal}', Platform='{platform}'")
-    
+def strip_ad_unit_type(ad_unit_type):
+    ad_unit_type = ad_unit_type or ''
     if ad_unit_type.startswith('TIL_'):
         ad_unit_type = ad_unit_type[4:]
-    
-    final_rows.append([
-        row[0], row[1], row[2], row[3], '', row[5], row[6], platform, portal, row[8], ad_unit_type, row[10]
-    ])
+    return ad_unit_type
+
 
-print(f"✅ Created {len(final_rows)} Final_Innov_Details rows")
+def build_final_rows(sheet2_rows, imp_lookup, diag):
+    """
+    Parse Website into Publisher/Platform and merge Imp. Commitment in one pass.
+    Imp. Commitment is shown only in the first row for each Package ID + Geo Name.
+    """
+    portals = InternCache(parse_portal_platform)
+    ad_units = InternCache(strip_ad_unit_type)
+    geo_keys = InternCache(str.strip)
+    seen = set()
+    matched = 0
+    final_rows = []
+    append = final_rows.append
+    print(f"✅ Processing {len(sheet2_rows)} Sheet2 rows for Final_Innov_Details")
+
+    for row in sheet2_rows:
+        website = row[7]
+        if website in SPECIAL_WEBSITES:
+            diag.count('Special websites (Website, Ad Unit Type)', (website, row[9] or ''))
+
+        # Only str Websites are cached: 1 and 1.0 hash alike but parse differently
+        portal, platform = portals[website] if type(website) is str else parse_portal_platform(website)
+
+        pkg_id = row[2]
+        geo = row[6]
+        key = (pkg_id, geo)
+        if key in seen:
+            imp_commitment = ''
+        else:
+            seen.add(key)
+            # Same 1 == 1.0 caveat as Website: only str Geo Names share the cache
+            geo_key = geo_keys[geo] if type(geo) is str else str(geo).strip()
+            imp_commitment = imp_lookup.get((pkg_id, geo_key), '')
+            if imp_commitment != '':
+                matched += 1
+
+        append(FinalRow(
+            row[0], row[1], pkg_id, row[3], imp_commitment, row[5], geo,
+            platform, portal, row[8], ad_units[row[9]], row[10],
+        ))
+
+    print(f"✅ Created {len(final_rows)} Final_Innov_Details rows")
+    diag.note(f"Sample keys from main data: {[(row[2], str(row[6]).strip()) for row in final_rows[:5]]}")
+    diag.note(f"Imp. Commitment shown for {matched} of {len(seen)} Package ID + Geo Name pairs")
+    diag.tally(
+        'Bottom Overlay (Website, Publisher, Platform)',
+        ((sheet2_row[7], final_row[8], final_row[7])
+         for sheet2_row, final_row in zip(sheet2_rows, final_rows)
+         if sheet2_row[9] == 'TIL_Bottom Overlay')
+    )
+    return final_rows
 
-# Report E-TIMES WEBSITE findings
-if etimes_website_count > 0:
-    print(f"⚠️  Found {etimes_website_count} rows with 'E-TIMES WEBSITE':")
-    for row_num, ad_unit in etimes_website_rows:
-        print(f"  Row {row_num}: Ad Unit Type = '{ad_unit}'")
-else:
-    print("✅ No 'E-TIMES WEBSITE' entries found in Sheet2 data")
 
 # === 4. Fetch Impression Commitment from GSheet and merge ===
-scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-gc = gspread.authorize(creds)
-sh = gc.open_by_url(GSHEET_URL)
+def authorize(service_account_file):
+    """Return an authorized gspread client"""
+    import gspread
+    from google.oauth2.service_account import Credentials
 
-def fetch_imp_commitment_data():
+    creds = Credentials.from_service_account_file(service_account_file, scopes=SCOPES)
+    return gspread.authorize(creds)
+
+
+def fetch_imp_commitment_data(gc, diag, url=IMP_COMMITMENT_GSHEET_URL):
+    if gc is None:
+        return []
     try:
-        spreadsheet_id = IMP_COMMITMENT_GSHEET_URL.split('/d/')[1].split('/')[0]
+        spreadsheet_id = url.split('/d/')[1].split('/')[0]
         imp_spreadsheet = gc.open_by_key(spreadsheet_id)
         imp_worksheet = imp_spreadsheet.worksheet('Impression_Commitment')
         imp_data = imp_worksheet.get_all_records()
         print(f"✅ Fetched {len(imp_data)} rows from Impression_Commitment sheet")
         if imp_data:
-            print("Available columns in Impression_Commitment sheet:", list(imp_data[0].keys()))
-            print("Sample Impression Commitment row:", imp_data[0])
+            diag.note(f"Impression_Commitment columns: {list(imp_data[0].keys())}")
+            diag.note(f"Sample Impression Commitment row: {imp_data[0]}")
         return imp_data
     except Exception as e:
         print(f"❌ Failed to fetch Impression Commitment data: {e}")
         return []
 
-imp_commitment_data = fetch_imp_commitment_data()
 
-# Explicitly set the expected column names (update these if your sheet uses different names)
-IMP_PKGID_COL = 'Til_Package_Id__c'  # or whatever the actual column name is
-IMP_GEONAME_COL = 'Geo__c'           # or whatever the actual column name is
-IMP_VAL_COL = 'Geo_Level_Imp__c'   # or whatever the actual column name is
+def build_imp_lookup(imp_commitment_data, diag):
+    imp_lookup = {}
+    if imp_commitment_data:
+        for row in imp_commitment_data:
+            pkgid = norm_pkgid(row.get(IMP_PKGID_COL, ''))
+            geoname = str(row.get(IMP_GEONAME_COL, '')).strip()
+            val = row.get(IMP_VAL_COL, '')
+            imp_lookup[(pkgid, geoname)] = val
+        diag.note(f"Sample keys from Impression Commitment lookup: {list(imp_lookup.keys())[:5]}")
+    return imp_lookup
 
-imp_lookup = {}
-if imp_commitment_data:
-    for row in imp_commitment_data:
-        pkgid = norm_pkgid(row.get(IMP_PKGID_COL, ''))
-        geoname = str(row.get(IMP_GEONAME_COL, '')).strip()
-        val = row.get(IMP_VAL_COL, '')
-        imp_lookup[(pkgid, geoname)] = val
-    print("Sample keys from Impression Commitment lookup:", list(imp_lookup.keys())[:5])
-
-# Add Imp. Commitment to final_rows
-sample_main_keys = []
-for i, row in enumerate(final_rows):
-    key = (norm_pkgid(row[2]), str(row[6]).strip())
-    if i < 5:
-        sample_main_keys.append(key)
-    val = imp_lookup.get(key, '')
-    final_rows[i][4] = val
-print("Sample keys from main data:", sample_main_keys)
-
-# Show Imp. Commitment only in first row for each Package ID + Geo Name
-seen = set()
-for i, row in enumerate(final_rows):
-    key = (row[2], row[6])
-    if key in seen:
-        final_rows[i][4] = ''
-    else:
-        seen.add(key)
 
 # === 5. Create sorted version of Final_Innov_Details ===
 def create_sorted_final_innov_details(final_rows, final_headers):
@@ -371,11 +444,12 @@ def create_sorted_final_innov_details(final_rows, final_headers):
         # Default group
         return 'Other'
     
-    # Group rows by package group
+    # Group rows by package group (one pattern scan per distinct package name)
+    package_groups = InternCache(get_package_group)
     grouped_rows = {}
     for row in final_rows:
         package_name = row[3]  # Package Name is at index 3
-        group = get_package_group(package_name)
+        group = package_groups[package_name]
         
         if group not in grouped_rows:
             grouped_rows[group] = []
@@ -402,46 +476,174 @@ def create_sorted_final_innov_details(final_rows, final_headers):
     print(f"✅ Created sorted version with {len(sorted_groups)} total rows")
     return sorted_groups
 
-# Create the sorted version
-final_rows_sorted = create_sorted_final_innov_details(final_rows, final_headers)
+# === 6. Write all sheets to the output sink ===
+def write_tabs(sink, book, sheet2_rows, final_rows, final_rows_sorted, date_format='iso'):
+    """Serialize every tab with its column schema and hand it to the sink; returns the final payloads"""
+    def write_tab(sheet_name, headers, rows):
+        payload = compile_serializer(sheet_name, headers, date_format)(rows)
+        sink.write(sheet_name, headers, payload)
+        return payload
+
+    with sink:
+        # Data
+        write_tab('Data', book.data_headers, book.raw_rows('Data'))
+        # Configs
+        write_tab('Configs', book.configs_headers, book.raw_rows('Configs'))
+        # Config2
+        write_tab('Config2', book.configs_headers, book.configs_rows)
+        # Sheet2
+        write_tab('Sheet2', SHEET2_HEADERS, sheet2_rows)
+        # Final_Innov_Details
+        final_payload = write_tab('Final_Innov_Details', FINAL_HEADERS, final_rows)
+
+        # Final_Innov_Details_sorted
+        sorted_payload = write_tab('Final_Innov_Details_sorted', FINAL_HEADERS, final_rows_sorted)
+
+        # Final_Innov_Details_sorted| For Ops Reference (copy of Final_Innov_Details_sorted)
+        sink.write('Final_Innov_Details_sorted| For Ops Reference', FINAL_HEADERS, sorted_payload)
+
+    print(f"✅ All sheets written to {sink.description}!")
+    return final_payload, sorted_payload
+
+
+def find_local_output(path):
+    """
+    Resolve OUTPUT_PATH (or --from) the way the local sinks do; returns
+    ('xlsx', workbook path) or ('csv', directory)
+    """
+    from output_sinks import XLSX_DEFAULT_NAME, expand_output_path, safe_filename
+
+    path = expand_output_path(path)
+    if path.endswith('.xlsx'):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"No workbook at {path}")
+        return 'xlsx', path
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No local output at {path}")
+    if os.path.isfile(os.path.join(path, XLSX_DEFAULT_NAME)):
+        return 'xlsx', os.path.join(path, XLSX_DEFAULT_NAME)
+    if os.path.isfile(os.path.join(path, safe_filename(OUTPUT_TABS[0]) + '.csv')):
+        return 'csv', path
+    if os.path.isfile(os.path.join(path, safe_filename(OUTPUT_TABS[0]) + '.parquet')):
+        raise ValueError(f"{path} holds parquet output, which cannot be uploaded; "
+                         f"write it with --sink xlsx or --sink csv instead")
+    raise FileNotFoundError(f"No {XLSX_DEFAULT_NAME} or CSV tabs in {path}")
+
+
+def upload_local_output(path, gc, gsheet_url):
+    """Push tabs written earlier by the xlsx or csv sink to Google Sheets"""
+    import csv
+    from output_sinks import GoogleSheetsSink, XLSX_MAX_TITLE, safe_filename
+    from sheet_schema import parse_csv_rows
+
+    kind, path = find_local_output(path)
+    sink = GoogleSheetsSink(gc.open_by_url(gsheet_url))
+    if kind == 'csv':
+        for sheet_name in OUTPUT_TABS:
+            with open(os.path.join(path, safe_filename(sheet_name) + '.csv'), newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+            # csv.reader yields strings only; restore numbers so they are not uploaded as text
+            sink.write(sheet_name, rows[0], parse_csv_rows(sheet_name, rows[0], rows[1:]))
+    else:
+        import openpyxl
 
-# === 6. Upload all sheets to Google Sheets ===
-def upload_to_gsheet(rows, headers, sheet_name):
+        wb = openpyxl.load_workbook(path, read_only=True)
+        for sheet_name in OUTPUT_TABS:
+            values = wb[sheet_name[:XLSX_MAX_TITLE]].iter_rows(values_only=True)
+            headers = list(next(values))
+            sink.write(sheet_name, headers, [['' if v is None else v for v in row] for row in values])
+        wb.close()
+    print(f"✅ Uploaded {path} to Google Sheets")
+
+
+# === Full run ===
+class ProcessResult:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def process(config=None, gc=None, diag=None):
+    """
+    Run every stage for one workbook. `gc` may be an already authorized (or
+    fake) gspread client; otherwise one is created when the run needs Sheets.
+    """
+    config = config or PipelineConfig.from_env()
+    diag = diag or Diagnostics()
+    summary = RunSummary()
+
+    # Stages run inside try/finally so the diagnostics gathered so far are
+    # printed even when a later stage (auth, Sheets, output) raises
     try:
+        book = BookingWorkbook(config.excel_path)
+        configs_lookup = build_configs_lookup(book.configs_rows, book.configs_headers)
+        print(f"✅ Loaded {len(book.configs_rows)} config rows")
+        print(f"✅ Found {len(configs_lookup)} unique package IDs in configs")
+        summary.stage_done('Load', f"{len(book.data_rows)} HB/PHB data rows, {len(book.configs_rows)} config rows, {len(configs_lookup)} packages")
+        diag.sample_rows('Config2', book.configs_rows, book.configs_headers, ['Package ID', 'Website', 'Ad Unit Type'])
+
+        sheet2_rows = build_sheet2(book.data_rows, book.data_headers, configs_lookup, book.configs_headers, diag)
+        summary.stage_done('Sheet2', f"{len(sheet2_rows)} rows")
+        diag.sample_rows('Sheet2', sheet2_rows, SHEET2_HEADERS, ['Package ID', 'Website', 'Ad Unit Type'])
+
+        if gc is None:
+            if config.output_sink != 'gsheet' and not os.path.exists(config.service_account_file):
+                # Offline run with a local sink: no Sheets access at all
+                print(f"⚠️  {config.service_account_file} not found, running offline without Impression Commitment data")
+            else:
+                gc = authorize(config.service_account_file)
+        imp_commitment_data = fetch_imp_commitment_data(gc, diag)
+        imp_lookup = build_imp_lookup(imp_commitment_data, diag)
+        summary.stage_done('Imp. Commitment', f"{len(imp_commitment_data)} commitment rows, {len(imp_lookup)} package/geo keys")
+
+        final_rows = build_final_rows(sheet2_rows, imp_lookup, diag)
+        summary.stage_done('Final_Innov_Details', f"{len(final_rows)} rows")
+        diag.sample_rows('Final_Innov_Details', final_rows, FINAL_HEADERS, ['Package ID', 'Publisher', 'Platform', 'Ad Unit Type'])
+
+        final_rows_sorted = create_sorted_final_innov_details(final_rows, FINAL_HEADERS)
+        summary.stage_done('Sorted', f"{len(final_rows_sorted)} rows")
+
+        sink = create_sink(
+            config.output_sink,
+            path=config.output_path,
+            spreadsheet=gc.open_by_url(config.gsheet_url) if config.output_sink == 'gsheet' else None,
+        )
+        final_payload, sorted_payload = write_tabs(
+            sink, book, sheet2_rows, final_rows, final_rows_sorted, config.sheet_date_format
+        )
+        summary.stage_done('Output', f"7 tabs written to {sink.description}")
+
+        # === 7. Append this run to the local history store ===
+        if config.history_db:
+            try:
+                from run_history import record_run
+
+                run_id = record_run(config.history_db, FINAL_HEADERS, final_payload, sorted_payload, config.target_date)
+                print(f"✅ Recorded run {run_id} for {config.target_date} in {config.history_db}")
+                summary.stage_done('History', f"run {run_id} recorded")
+            except Exception as e:
+                print(f"❌ Failed to record run history: {e}")
+    finally:
+        diag.report()
+
+    # === 8. Queue the notification email ===
+    if config.notify_outbox:
+        from send_email import enqueue_notification
+
         try:
-            worksheet = sh.worksheet(sheet_name)
-            worksheet.clear()
-        except gspread.exceptions.WorksheetNotFound:
-            worksheet = sh.add_worksheet(title=sheet_name, rows=1000, cols=30)
-        worksheet.update([headers] + rows)
-        print(f"✅ Uploaded {sheet_name}")
-    except Exception as e:
-        print(f"❌ Failed to upload {sheet_name}: {e}")
-
-# Prepare Data, Configs, Config2 for upload
-# Data
-upload_to_gsheet(
-    [[cell.value for cell in row] for row in data_ws.iter_rows(min_row=2)],
-    data_headers,
-    'Data'
-)
-# Configs
-upload_to_gsheet(
-    [[cell.value for cell in row] for row in configs_ws.iter_rows(min_row=2)],
-    configs_headers,
-    'Configs'
-)
-# Config2
-upload_to_gsheet(configs_rows, configs_headers, 'Config2')
-# Sheet2
-upload_to_gsheet(sheet2_rows, sheet2_headers, 'Sheet2')
-# Final_Innov_Details
-upload_to_gsheet(final_rows, final_headers, 'Final_Innov_Details')
-
-# Final_Innov_Details_sorted
-upload_to_gsheet(final_rows_sorted, final_headers, 'Final_Innov_Details_sorted')
-
-# Final_Innov_Details_sorted| For Ops Reference (copy of Final_Innov_Details_sorted)
-upload_to_gsheet(final_rows_sorted, final_headers, 'Final_Innov_Details_sorted| For Ops Reference')
-
-print("✅ All sheets uploaded to Google Sheets!")
+            enqueue_notification(summary.lines)
+        except Exception as e:
+            print(f"❌ Failed to queue notification: {e}")
+
+    return ProcessResult(
+        config=config, book=book, sheet2_rows=sheet2_rows, final_rows=final_rows,
+        final_rows_sorted=final_rows_sorted, sink=sink, summary=summary,
+    )
+
+
+def main():
+    process(PipelineConfig.from_env())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Bounded-cost debug diagnostics for data_processing.py.
+
+The processing loops only bump counters in their rare branches; row samples
+are taken from the finished row lists afterwards (first N rows plus a random
+reservoir), and everything is printed as one report at the end of the run.
+
+DIAGNOSTICS_VERBOSITY controls the report:
+    0  nothing
+    1  notes and counters (default)
+    2  also sampled rows and tallies
+"""
+import os
+import random
+from collections import Counter, defaultdict
+
+
+class Diagnostics:
+    def __init__(self, verbosity=None, head=3, reservoir=3, top=10, seed=None):
+        if verbosity is None:
+            raw = os.getenv('DIAGNOSTICS_VERBOSITY', '1')
+            try:
+                verbosity = int(raw)
+            except ValueError:
+                print(f"⚠️  DIAGNOSTICS_VERBOSITY={raw!r} is not 0, 1 or 2, using 1")
+                verbosity = 1
+        self.verbosity = verbosity
+        self.head = head
+        self.reservoir = reservoir
+        self.top = top
+        self._rng = random.Random(seed)
+        self._notes = []
+        self._counters = defaultdict(Counter)
+        self._samples = []
+
+    def note(self, message):
+        """Record a one-off line for the report"""
+        self._notes.append(message)
+
+    def count(self, name, key, n=1):
+        """Bump counter `name` for `key`; meant for rare branches inside loops"""
+        self._counters[name][key] += n
+
+    def tally(self, name, keys, min_verbosity=2):
+        """
+        Count an iterable of keys, e.g. a generator over finished rows. The
+        iterable is only consumed when the report will show it.
+        """
+        if self.verbosity >= min_verbosity:
+            self._counters[name].update(keys)
+
+    def sample_rows(self, stage, rows, headers, columns=None):
+        """Keep the first `head` rows and a random reservoir of the rest"""
+        if self.verbosity < 2 or not rows:
+            return
+        if columns is None:
+            columns = headers
+        idx = [headers.index(c) for c in columns]
+        head = [(i, rows[i]) for i in range(min(self.head, len(rows)))]
+        rest = range(len(head), len(rows))
+        picked = sorted(self._rng.sample(rest, min(self.reservoir, len(rest))))
+        self._samples.append((stage, len(rows), columns, idx, head, [(i, rows[i]) for i in picked]))
+
+    def report(self):
+        if self.verbosity < 1:
+            return
+        print("🔍 Diagnostics report")
+        for message in self._notes:
+            print(f"  {message}")
+        for name, counter in self._counters.items():
+            total = sum(counter.values())
+            print(f"  {name}: {total} rows, {len(counter)} distinct")
+            for key, n in counter.most_common(self.top):
+                print(f"    {n:>7}  {key}")
+            if len(counter) > self.top:
+                print(f"    ... {len(counter) - self.top} more")
+        for stage, total, columns, idx, head, picked in self._samples:
+            print(f"  {stage}: first {len(head)} and {len(picked)} random of {total} rows")
+            for i, row in head + picked:
+                fields = ', '.join(f"{c}='{row[j]}'" for c, j in zip(columns, idx))
+                print(f"    Row {i + 1}: {fields}")
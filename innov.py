@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Innovation sheet pipeline.
+
+    python innov.py download                  # Expresso -> BookingData.xlsx (selenium)
+    python innov.py process                   # workbook -> output sink (OUTPUT_SINK, default gsheet)
+    python innov.py process --sink csv --output out/
+    python innov.py upload --from out/        # push a local xlsx/csv output to Google Sheets
+    python innov.py notify                    # flush the notification outbox
+    python innov.py run                       # download, process, notify
+
+Each subcommand imports only what it needs: nothing but `download` loads
+selenium, and a local-sink `process` run never loads gspread or google-auth.
+"""
+import argparse
+import os
+import sys
+
+
+def cmd_download(args):
+    import main
+
+    return 0 if main.main() else 1
+
+
+def process_config(args):
+    import data_processing
+
+    notify = None
+    if args.notify is not None:
+        notify = args.notify == 'yes'
+    return data_processing.PipelineConfig.from_env(
+        excel_path=args.excel,
+        output_sink=args.sink,
+        output_path=args.output,
+        sheet_date_format=args.date_format,
+        history_db='' if args.no_history else None,
+        target_date=args.target_date,
+        notify_outbox=notify,
+    )
+
+
+def cmd_process(args):
+    import data_processing
+
+    data_processing.process(process_config(args))
+    return 0
+
+
+def cmd_upload(args):
+    import data_processing
+
+    try:
+        data_processing.find_local_output(args.source)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    gc = data_processing.authorize(
+        os.getenv('SERVICE_ACCOUNT_FILE', data_processing.DEFAULT_SERVICE_ACCOUNT_FILE)
+    )
+    url = os.getenv('GSHEET_URL', data_processing.DEFAULT_GSHEET_URL)
+    data_processing.upload_local_output(args.source, gc, url)
+    return 0
+
+
+def cmd_notify(args):
+    import send_email
+
+    outbox = {'db_path': args.db} if args.db else {}
+    if args.enqueue:
+        send_email.enqueue_notification(**outbox)
+    if not args.no_flush:
+        send_email.flush_outbox(**outbox)
+    # A failing relay leaves mail queued for the next run instead of failing the job
+    return 0
+
+
+def cmd_run(args):
+    if cmd_download(args) != 0:
+        print("❌ Download failed, skipping processing")
+        return 1
+    cmd_process(args)
+
+    import send_email
+
+    send_email.flush_outbox()
+    return 0
+
+
+def add_process_args(parser):
+    parser.add_argument('--excel', help='Booking workbook (default EXCEL_PATH)')
+    parser.add_argument('--sink', choices=['gsheet', 'xlsx', 'csv', 'parquet'],
+                        help='Output sink (default OUTPUT_SINK or gsheet)')
+    parser.add_argument('--output', help='File/directory for local sinks (default OUTPUT_PATH)')
+    parser.add_argument('--date-format', choices=['iso', 'serial'], help='How dates are written')
+    parser.add_argument('--target-date', help='Date the bookings are for (default tomorrow)')
+    parser.add_argument('--no-history', action='store_true', help='Do not record the run in HISTORY_DB')
+    parser.add_argument('--notify', choices=['yes', 'no'],
+                        help='Queue the notification email (default: only for gsheet runs)')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Innovation sheet updater')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('download', help='Download tomorrow\'s bookings from Expresso')
+    p.set_defaults(func=cmd_download)
+
+    p = sub.add_parser('process', help='Process the workbook and write all tabs to the output sink')
+    add_process_args(p)
+    p.set_defaults(func=cmd_process)
+
+    p = sub.add_parser('upload', help='Upload a local xlsx/csv output to Google Sheets')
+    p.add_argument('--from', dest='source', default=os.getenv('OUTPUT_PATH', 'output'),
+                   help='xlsx file, or directory holding innov_output.xlsx or csv tabs, '
+                        'written by `process` (default OUTPUT_PATH)')
+    p.set_defaults(func=cmd_upload)
+
+    p = sub.add_parser('notify', help='Send queued notification emails')
+    p.add_argument('--db', help='Outbox SQLite file (default OUTBOX_DB)')
+    p.add_argument('--enqueue', action='store_true', help='Queue the standard daily email first')
+    p.add_argument('--no-flush', action='store_true', help='Only queue, do not send')
+    p.set_defaults(func=cmd_notify)
+
+    p = sub.add_parser('run', help='download, process and notify')
+    add_process_args(p)
+    p.set_defaults(func=cmd_run)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,26 +3,21 @@ import time
 import random
 import shutil
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import sys
 
 # ===== CONFIGURATION =====
 # Get environment variables or use default values
 DOWNLOAD_DIR = os.getenv('DOWNLOAD_DIR', '/tmp/BookingData_folder')
 EXPRESSO_URL = "https://expresso.colombiaonline.com"
-USERNAME = os.getenv('EXPRESSO_USERNAME')  # Get from Bitbucket variables
-PASSWORD = os.getenv('EXPRESSO_PASSWORD')  # Get from Bitbucket variables
 
-# Validate required environment variables
-if not USERNAME or not PASSWORD:
-    raise ValueError("EXPRESSO_USERNAME and EXPRESSO_PASSWORD environment variables must be set")
+def get_credentials():
+    """Expresso login from the environment (Bitbucket/GitHub variables)"""
+    username = os.getenv('EXPRESSO_USERNAME')
+    password = os.getenv('EXPRESSO_PASSWORD')
+    # Validate required environment variables
+    if not username or not password:
+        raise ValueError("EXPRESSO_USERNAME and EXPRESSO_PASSWORD environment variables must be set")
+    return username, password
 
 # ===== DIRECTORY MANAGEMENT =====
 def clear_download_directory():
@@ -92,6 +87,8 @@ def human_type(element, text):
 # ===== STEALTH CHROME CONFIG (WITH POPUP BLOCKING) =====
 def get_chrome_options():
     """Configure Chrome options for headless operation"""
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     
     # Basic stealth settings
@@ -131,6 +128,16 @@ def get_chrome_options():
 
 def main():
     """Main execution function"""
+    # Selenium is only needed here, so other entry points don't pay for importing it
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    username, password = get_credentials()
     driver = None
     try:
         # Clear download directory before starting
@@ -193,7 +200,7 @@ def main():
             print(driver.page_source[:2000])
             raise Exception("Username field not found with any selector")
         
-        human_type(username_field, USERNAME)
+        human_type(username_field, username)
         random_delay()
 
         # Try multiple selectors for password field
@@ -219,7 +226,7 @@ def main():
         if not password_field:
             raise Exception("Password field not found with any selector")
         
-        human_type(password_field, PASSWORD)
+        human_type(password_field, password)
         random_delay(0.5, 1.5)
         password_field.send_keys(Keys.RETURN)
 
@@ -0,0 +1,234 @@
+"""
+Persistent outbox for notification emails.
+
+The pipeline only enqueues a message (one SQLite insert) and carries on. A
+worker later flushes every pending message over a single SMTP connection,
+retrying transient failures with backoff. Messages that still fail stay in
+the outbox for the next flush until MAX_ATTEMPTS is reached. If the relay
+itself is unreachable the flush stops at the first message instead of
+waiting out the timeouts once per queued message.
+"""
+import json
+import os
+import smtplib
+import socket
+import sqlite3
+import time
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+DEFAULT_OUTBOX_DB = os.getenv('OUTBOX_DB', 'history/notification_outbox.sqlite')
+MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '10'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    from_email TEXT NOT NULL,
+    from_header TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, id);
+"""
+
+
+def is_transient(error):
+    """Dropped connections, socket errors and 4xx replies are worth a retry"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        # e.g. SMTPRecipientsRefused, SMTPNotSupportedError
+        return False
+    return isinstance(error, OSError)
+
+
+def is_timeout(error):
+    """
+    smtplib reports a read timeout as SMTPServerDisconnected raised from the
+    timeout. socket.timeout is only an alias of TimeoutError from Python 3.10.
+    """
+    timeouts = (TimeoutError, socket.timeout)
+    return isinstance(error, timeouts) or isinstance(error.__context__, timeouts)
+
+
+def is_connection_error(error):
+    """
+    The relay is down or unreachable, as opposed to rejecting one message.
+    SMTPException subclasses OSError, so per-message rejections such as
+    SMTPRecipientsRefused have to be ruled out first.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+def connect(db_path=DEFAULT_OUTBOX_DB):
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue(subject, body, recipients, from_email, from_header, db_path=DEFAULT_OUTBOX_DB):
+    """Queue one message and return its id; never talks to SMTP"""
+    conn = connect(db_path)
+    try:
+        with conn:
+            cur = conn.execute(
+                'INSERT INTO outbox (created_at, from_email, from_header, recipients, subject, body) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (datetime.now().isoformat(sep=' ', timespec='seconds'), from_email, from_header,
+                 json.dumps(recipients), subject, body),
+            )
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+class SmtpSettings:
+    def __init__(self, server, port, username=None, password=None, starttls=True, timeout=30):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            server=os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+            port=int(os.getenv('SMTP_PORT', '587')),
+            username=os.getenv('SMTP_USERNAME'),
+            password=os.getenv('SMTP_PASSWORD'),
+            # Set SMTP_STARTTLS=0 for a local stand-in server without TLS
+            starttls=os.getenv('SMTP_STARTTLS', '1') != '0',
+            timeout=int(os.getenv('SMTP_TIMEOUT', '30')),
+        )
+
+
+class OutboxWorker:
+    """Flushes pending messages over one reused SMTP connection"""
+
+    def __init__(self, settings, db_path=DEFAULT_OUTBOX_DB, retries=3, backoff=2.0,
+                 max_attempts=MAX_ATTEMPTS):
+        self.settings = settings
+        self.db_path = db_path
+        self.retries = retries
+        self.backoff = backoff
+        self.max_attempts = max_attempts
+        self._server = None
+
+    def _connection(self):
+        if self._server is None:
+            s = self.settings
+            print(f"Connecting to SMTP server: {s.server}:{s.port}")
+            server = smtplib.SMTP(s.server, s.port, timeout=s.timeout)
+            try:
+                if s.starttls:
+                    server.starttls()
+                if s.username:
+                    server.login(s.username, s.password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+        return self._server
+
+    def _drop_connection(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                self._server.close()
+            self._server = None
+
+    def _send(self, from_email, from_header, recipients, subject, body):
+        msg = MIMEMultipart()
+        msg['From'] = from_header
+        msg['To'] = ', '.join(recipients)
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+        text = msg.as_string()
+
+        for attempt in range(self.retries):
+            try:
+                # Returns the recipients the relay refused, if it accepted any
+                return self._connection().sendmail(from_email, recipients, text)
+            except Exception as e:
+                self._drop_connection()
+                # A timed out relay will most likely time out again; don't wait it out twice
+                if not is_transient(e) or is_timeout(e) or attempt == self.retries - 1:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def flush(self):
+        """
+        Send every pending message; returns (sent, failed). A connection-level
+        failure ends the flush and leaves the remaining messages pending.
+        """
+        conn = connect(self.db_path)
+        sent = failed = 0
+        try:
+            pending = conn.execute(
+                "SELECT id, from_email, from_header, recipients, subject, body, attempts "
+                "FROM outbox WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+            for i, (msg_id, from_email, from_header, recipients, subject, body, attempts) in enumerate(pending):
+                try:
+                    refused = self._send(from_email, from_header, json.loads(recipients), subject, body)
+                except Exception as e:
+                    failed += 1
+                    status = 'failed' if attempts + 1 >= self.max_attempts else 'pending'
+                    with conn:
+                        conn.execute(
+                            'UPDATE outbox SET attempts = attempts + 1, last_error = ?, status = ? '
+                            'WHERE id = ?', (str(e), status, msg_id)
+                        )
+                    print(f"❌ Failed to send notification {msg_id} ({subject}): {e}")
+                    if is_connection_error(e):
+                        if len(pending) > i + 1:
+                            print(f"⚠️  SMTP relay unreachable, leaving {len(pending) - i - 1} "
+                                  f"notification(s) pending")
+                        break
+                    continue
+                sent += 1
+                error = None
+                if refused:
+                    error = 'Refused recipients: ' + ', '.join(
+                        f"{addr} ({code} {reply.decode(errors='replace') if isinstance(reply, bytes) else reply})"
+                        for addr, (code, reply) in refused.items()
+                    )
+                with conn:
+                    conn.execute(
+                        "UPDATE outbox SET attempts = attempts + 1, status = 'sent', sent_at = ?, "
+                        "last_error = ? WHERE id = ?",
+                        (datetime.now().isoformat(sep=' ', timespec='seconds'), error, msg_id)
+                    )
+                if refused:
+                    print(f"⚠️  Sent notification {msg_id} ({subject}), but {error}")
+                else:
+                    print(f"✅ Sent notification {msg_id} ({subject})")
+        finally:
+            self._drop_connection()
+            conn.close()
+        return sent, failed
+
+
+def pending_count(db_path=DEFAULT_OUTBOX_DB):
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+    finally:
+        conn.close()
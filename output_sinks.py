@@ -0,0 +1,204 @@
+"""
+Output sinks for the processed tabs.
+
+data_processing.py writes its seven tabs (Data, Configs, Config2, Sheet2,
+Final_Innov_Details and the two sorted copies) through one of these. The
+Google Sheets sink is the production behaviour; the local sinks write the same
+tabs to disk for offline runs, regression diffs and archiving.
+"""
+import csv
+import os
+import re
+from datetime import datetime
+
+SINK_KINDS = ('gsheet', 'xlsx', 'csv', 'parquet')
+XLSX_MAX_TITLE = 31
+XLSX_DEFAULT_NAME = 'innov_output.xlsx'
+
+
+def safe_filename(sheet_name):
+    """Turn a tab name like 'Final_Innov_Details_sorted| For Ops Reference' into a file name"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', sheet_name).strip('_')
+
+
+class OutputSink:
+    """
+    Base class: write() is called once per tab, then close() once at the end,
+    or abort() instead when a write raised inside the `with` block
+    """
+
+    description = 'output'
+
+    def write(self, sheet_name, headers, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class GoogleSheetsSink(OutputSink):
+    """Clear and overwrite each tab of a gspread Spreadsheet"""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.description = 'Google Sheets'
+
+    def write(self, sheet_name, headers, rows):
+        import gspread
+
+        try:
+            try:
+                worksheet = self.spreadsheet.worksheet(sheet_name)
+                worksheet.clear()
+            except gspread.exceptions.WorksheetNotFound:
+                worksheet = self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=30)
+            worksheet.update([headers] + rows)
+            print(f"✅ Uploaded {sheet_name}")
+        except Exception as e:
+            print(f"❌ Failed to upload {sheet_name}: {e}")
+
+
+class XlsxSink(OutputSink):
+    """Write every tab into a single workbook using openpyxl's write-only mode"""
+
+    def __init__(self, path):
+        import openpyxl
+
+        if not path.endswith('.xlsx'):
+            path = os.path.join(path, XLSX_DEFAULT_NAME)
+        self.path = path
+        self.description = path
+        self._wb = openpyxl.Workbook(write_only=True)
+        self._titles = set()
+
+    def _title(self, sheet_name):
+        # Excel caps tab names at 31 characters; keep truncated names unique
+        title = sheet_name[:XLSX_MAX_TITLE]
+        n = 1
+        while title in self._titles:
+            suffix = f'~{n}'
+            title = sheet_name[:XLSX_MAX_TITLE - len(suffix)] + suffix
+            n += 1
+        self._titles.add(title)
+        return title
+
+    def write(self, sheet_name, headers, rows):
+        ws = self._wb.create_sheet(self._title(sheet_name))
+        ws.append(headers)
+        for row in rows:
+            ws.append(row)
+        print(f"✅ Wrote {sheet_name} ({len(rows)} rows)")
+
+    def close(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Save next to the target and rename, so OUTPUT_PATH never holds a partial workbook
+        tmp_path = self.path + '.tmp'
+        try:
+            self._wb.save(tmp_path)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        print(f"✅ Saved {self.path}")
+
+    def abort(self):
+        # Finish the write-only sheets' temp files (openpyxl removes them at exit) without saving
+        for ws in self._wb.worksheets:
+            ws.close()
+        self._wb = None
+        print(f"⚠️  Run failed, not saving {self.path}")
+
+
+class CsvSink(OutputSink):
+    """Write one CSV file per tab into a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.description = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, sheet_name, headers, rows):
+        path = os.path.join(self.directory, safe_filename(sheet_name) + '.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        print(f"✅ Wrote {sheet_name} to {path}")
+
+
+class ParquetSink(OutputSink):
+    """Write one Parquet file per tab into a directory (needs pyarrow)"""
+
+    def __init__(self, directory):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("The parquet sink needs pyarrow: pip install pyarrow")
+        self.directory = directory
+        self.description = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _column(values):
+        import pyarrow as pa
+
+        try:
+            # Payload blanks are '', which would force a numeric column such as
+            # Imp. Commitment to text; try them as nulls first
+            typed = pa.array([None if type(v) is str and v == '' else v for v in values])
+            if not (pa.types.is_string(typed.type) or pa.types.is_null(typed.type)):
+                return typed
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed cell types (e.g. float and text Package IDs) are stored as text
+            return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+    def write(self, sheet_name, headers, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = list(zip(*rows)) if rows else [()] * len(headers)
+        # Headers are not guaranteed unique in the raw Expresso tabs
+        names = [h if headers.index(h) == i else f'{h}_{i}' for i, h in enumerate(headers)]
+        table = pa.table({name: self._column(list(col)) for name, col in zip(names, columns)})
+        path = os.path.join(self.directory, safe_filename(sheet_name) + '.parquet')
+        pq.write_table(table, path)
+        print(f"✅ Wrote {sheet_name} to {path}")
+
+
+def expand_output_path(path):
+    """Apply the strftime codes allowed in OUTPUT_PATH"""
+    return datetime.now().strftime(path or 'output')
+
+
+def create_sink(kind, path=None, spreadsheet=None):
+    """
+    Build the sink selected by OUTPUT_SINK. `path` may contain strftime codes,
+    e.g. 'archive/%Y%m%d_%H%M%S', to keep one directory per run.
+    """
+    kind = (kind or 'gsheet').lower()
+    if kind == 'gsheet':
+        if spreadsheet is None:
+            raise ValueError("The gsheet sink needs an open spreadsheet")
+        return GoogleSheetsSink(spreadsheet)
+    if kind not in SINK_KINDS:
+        raise ValueError(f"Unknown OUTPUT_SINK '{kind}', expected one of {', '.join(SINK_KINDS)}")
+
+    path = expand_output_path(path)
+    if kind == 'xlsx':
+        return XlsxSink(path)
+    if kind == 'csv':
+        return CsvSink(path)
+    return ParquetSink(path)
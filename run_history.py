@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Local SQLite history of every run's Final_Innov_Details rows.
+
+data_processing.py appends the final and sorted rows of each run, keyed by
+run timestamp and target date. Runs older than HISTORY_KEEP_DAYS are pruned
+on insert so the store (and the Actions cache carrying it) stays bounded. The CLI answers questions that would otherwise
+mean digging through sheet version history:
+
+    python run_history.py runs
+    python run_history.py commitment 123456 --geo Mumbai
+    python run_history.py count --geo Mumbai --days 7
+    python run_history.py rows --package-id 123456 --latest
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+DEFAULT_DB = os.getenv('HISTORY_DB', 'history/innov_history.sqlite')
+
+
+def keep_days_from_env(default=30):
+    """HISTORY_KEEP_DAYS; 0 keeps every run, anything unparsable falls back to `default`"""
+    raw = os.getenv('HISTORY_KEEP_DAYS', str(default))
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"⚠️  HISTORY_KEEP_DAYS={raw!r} is not a number of days, using {default}")
+        return default
+
+
+KEEP_DAYS = keep_days_from_env()
+
+# Final_Innov_Details header -> history column
+HISTORY_COLUMNS = {
+    'Expresso ID': 'expresso_id',
+    'Campaign Name': 'campaign_name',
+    'Package ID': 'package_id',
+    'Package Name': 'package_name',
+    'Imp. Commitment': 'imp_commitment',
+    'Brand': 'brand',
+    'Geo Name': 'geo_name',
+    'Platform': 'platform',
+    'Publisher': 'publisher',
+    'Section': 'section',
+    'Ad Unit Type': 'ad_unit_type',
+    'Placement': 'placement',
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_ts TEXT NOT NULL,
+    target_date TEXT NOT NULL,
+    final_rows INTEGER NOT NULL,
+    sorted_rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS innov_rows (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    variant TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    {', '.join(f'{c} TEXT' for c in HISTORY_COLUMNS.values())}
+);
+CREATE INDEX IF NOT EXISTS idx_runs_target_date ON runs(target_date);
+CREATE INDEX IF NOT EXISTS idx_runs_run_ts ON runs(run_ts);
+CREATE INDEX IF NOT EXISTS idx_rows_package_id ON innov_rows(package_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_rows_geo_name ON innov_rows(geo_name, run_id);
+CREATE INDEX IF NOT EXISTS idx_rows_publisher ON innov_rows(publisher, run_id);
+"""
+
+
+def connect(db_path=DEFAULT_DB):
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def prune_runs(conn, keep_days, now=None):
+    """Delete runs recorded more than `keep_days` ago; returns how many went"""
+    cutoff = ((now or datetime.now()) - timedelta(days=keep_days)).isoformat(sep=' ', timespec='seconds')
+    old = 'SELECT run_id FROM runs WHERE run_ts < ?'
+    conn.execute(f'DELETE FROM innov_rows WHERE run_id IN ({old})', (cutoff,))
+    return conn.execute('DELETE FROM runs WHERE run_ts < ?', (cutoff,)).rowcount
+
+
+def record_run(db_path, headers, final_rows, sorted_rows, target_date, run_ts=None, keep_days=KEEP_DAYS):
+    """Append one run's final and sorted rows, pruning runs older than `keep_days`; returns the new run_id"""
+    run_ts = run_ts or datetime.now().isoformat(sep=' ', timespec='seconds')
+    idx = [headers.index(h) for h in HISTORY_COLUMNS]
+    columns = ', '.join(HISTORY_COLUMNS.values())
+    placeholders = ', '.join('?' * (len(HISTORY_COLUMNS) + 3))
+    insert = f'INSERT INTO innov_rows (run_id, variant, row_no, {columns}) VALUES ({placeholders})'
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            cur = conn.execute(
+                'INSERT INTO runs (run_ts, target_date, final_rows, sorted_rows) VALUES (?, ?, ?, ?)',
+                (run_ts, target_date, len(final_rows), len(sorted_rows)),
+            )
+            run_id = cur.lastrowid
+            for variant, rows in (('final', final_rows), ('sorted', sorted_rows)):
+                conn.executemany(insert, (
+                    (run_id, variant, n, *(str(row[i]) if row[i] is not None else '' for i in idx))
+                    for n, row in enumerate(rows, 1)
+                ))
+            pruned = prune_runs(conn, keep_days) if keep_days > 0 else 0
+        if pruned:
+            # Hand the freed pages back so the cached file actually shrinks
+            conn.execute('VACUUM')
+            print(f"🧹 Pruned {pruned} run(s) older than {keep_days} days from {db_path}")
+    finally:
+        conn.close()
+    return run_id
+
+
+# === Queries ===
+def list_runs(conn, limit=20):
+    return conn.execute(
+        'SELECT run_id, run_ts, target_date, final_rows, sorted_rows '
+        'FROM runs ORDER BY run_id DESC LIMIT ?', (limit,)
+    ).fetchall()
+
+
+def commitment_changes(conn, package_id, geo=None):
+    """
+    Imp. Commitment per run for a package (optionally one geo), keeping only
+    the runs where the value changed for that geo, including a commitment
+    being removed (new value '').
+    """
+    sql = (
+        "SELECT r.run_ts, r.target_date, i.geo_name, MAX(i.imp_commitment) "
+        "FROM innov_rows i JOIN runs r ON r.run_id = i.run_id "
+        "WHERE i.package_id = ? AND i.variant = 'final'"
+    )
+    params = [package_id]
+    if geo:
+        sql += ' AND i.geo_name = ?'
+        params.append(geo)
+    sql += ' GROUP BY i.run_id, i.geo_name ORDER BY i.run_id'
+
+    last = {}
+    changes = []
+    for run_ts, target_date, geo_name, value in conn.execute(sql, params):
+        # Only the first row per Package ID + Geo Name carries the value, so
+        # MAX() is '' exactly when the run had no commitment for the geo
+        previous = last.get(geo_name, '')
+        if previous != value:
+            changes.append((run_ts, target_date, geo_name, previous, value))
+        last[geo_name] = value
+    return changes
+
+
+def _filters(args):
+    clauses = ["i.variant = 'final'"]
+    params = []
+    for column, value in (('geo_name', args.geo), ('publisher', args.publisher),
+                          ('package_id', args.package_id), ('platform', args.platform),
+                          ('ad_unit_type', args.ad_unit_type)):
+        if value:
+            clauses.append(f'i.{column} = ?')
+            params.append(value)
+    since = args.since
+    if args.days:
+        since = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    if since:
+        clauses.append('r.target_date >= ?')
+        params.append(since)
+    if args.until:
+        clauses.append('r.target_date <= ?')
+        params.append(args.until)
+    if getattr(args, 'latest', False):
+        clauses.append('i.run_id = (SELECT MAX(run_id) FROM runs)')
+    return ' AND '.join(clauses), params
+
+
+def count_rows(conn, args):
+    where, params = _filters(args)
+    return conn.execute(
+        'SELECT r.run_id, r.run_ts, r.target_date, COUNT(*) '
+        'FROM innov_rows i JOIN runs r ON r.run_id = i.run_id '
+        f'WHERE {where} GROUP BY r.run_id ORDER BY r.run_id', params
+    ).fetchall()
+
+
+def find_rows(conn, args):
+    where, params = _filters(args)
+    columns = ', '.join(f'i.{c}' for c in HISTORY_COLUMNS.values())
+    return conn.execute(
+        f'SELECT r.run_ts, {columns} FROM innov_rows i JOIN runs r ON r.run_id = i.run_id '
+        f'WHERE {where} ORDER BY i.run_id, i.row_no LIMIT ?', params + [args.limit]
+    ).fetchall()
+
+
+# === CLI ===
+def print_table(headers, rows):
+    rows = [[str(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) for i, h in enumerate(headers)]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def add_filter_args(parser):
+    parser.add_argument('--geo', help='Geo Name')
+    parser.add_argument('--publisher', help='Publisher')
+    parser.add_argument('--package-id', help='Package ID')
+    parser.add_argument('--platform', help='Platform (Web, Mweb, AOS, IOS, Amp)')
+    parser.add_argument('--ad-unit-type', help='Ad Unit Type (without the TIL_ prefix)')
+    parser.add_argument('--since', help='First target date, YYYY-MM-DD')
+    parser.add_argument('--until', help='Last target date, YYYY-MM-DD')
+    parser.add_argument('--days', type=int, help='Only runs targeting the last N days')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Query the local Final_Innov_Details history')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'SQLite file (default {DEFAULT_DB})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('runs', help='List recorded runs')
+    p.add_argument('--limit', type=int, default=20)
+
+    p = sub.add_parser('commitment', help='When did a package\'s Imp. Commitment change?')
+    p.add_argument('package_id')
+    p.add_argument('--geo', help='Only this Geo Name')
+
+    p = sub.add_parser('count', help='Rows per run matching the filters')
+    add_filter_args(p)
+
+    p = sub.add_parser('rows', help='Rows matching the filters')
+    add_filter_args(p)
+    p.add_argument('--latest', action='store_true', help='Only the most recent run')
+    p.add_argument('--limit', type=int, default=200)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"❌ No history database at {args.db}")
+        return 1
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.command == 'runs':
+            print_table(['run_id', 'run_ts', 'target_date', 'final_rows', 'sorted_rows'],
+                        list_runs(conn, args.limit))
+        elif args.command == 'commitment':
+            print_table(['run_ts', 'target_date', 'geo_name', 'old', 'new'],
+                        commitment_changes(conn, args.package_id, args.geo))
+        elif args.command == 'count':
+            print_table(['run_id', 'run_ts', 'target_date', 'rows'], count_rows(conn, args))
+        elif args.command == 'rows':
+            print_table(['run_ts'] + list(HISTORY_COLUMNS), find_rows(conn, args))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,30 +1,29 @@
 #!/usr/bin/env python3
+import argparse
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import sys
 from datetime import datetime, timedelta
 
-def send_notification():
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_username = os.getenv("SMTP_USERNAME")
-    smtp_password = os.getenv("SMTP_PASSWORD")
+from notification_outbox import DEFAULT_OUTBOX_DB, OutboxWorker, SmtpSettings, enqueue, pending_count
+
+FROM_EMAIL = "ritesh.sanjay@timesinternet.in"
+FROM_HEADER = "Adtech Quality <ritesh.sanjay@timesinternet.in>"
 
-    from_email = "ritesh.sanjay@timesinternet.in"
-    from_header = "Adtech Quality <ritesh.sanjay@timesinternet.in>"
 
+def get_recipients():
     raw_recipients = os.getenv(
         "EMAIL_RECIPIENTS",
         "colombia.opsqc@timesinternet.in,ritesh.sanjay@timesinternet.in"
     )
-
-    recipients = [
+    return [
         email.strip()
         for email in raw_recipients.replace("\r", ",").replace("\n", ",").split(",")
         if email.strip()
     ]
 
+
+def build_notification(summary=None):
+    """Return (subject, body) for the daily mail; `summary` is a list of per-stage lines"""
     current_date = datetime.now().strftime("%Y-%m-%d")
     tomorrow_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
@@ -33,37 +32,54 @@ def send_notification():
         "https://docs.google.com/spreadsheets/d/1dp5WINj0Urrvk8Ul2rR_q6HDzjdeAp7iuw5IsY3J3f8/edit?gid=242384709#gid=242384709"
     )
 
-    msg = MIMEMultipart()
-    msg["From"] = from_header
-    msg["To"] = ", ".join(recipients)
-    msg["Subject"] = f"Daily Innovation Update for {current_date}"
-
+    subject = f"Daily Innovation Update for {current_date}"
     body = (
         f"Please find the link to the Automated Daily innovation sheet for "
         f"{tomorrow_date}:\n\n{google_sheet_url}"
     )
-    msg.attach(MIMEText(body, "plain"))
+    if summary:
+        body += "\n\nRun summary:\n" + "\n".join(f"- {line}" for line in summary)
+    return subject, body
 
-    server = None
-    try:
-        print(f"Connecting to SMTP server: {smtp_server}:{smtp_port}")
-        print(f"DEBUG recipients: {recipients}")
 
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_username, smtp_password)
+def enqueue_notification(summary=None, db_path=DEFAULT_OUTBOX_DB):
+    """Queue the daily mail in the outbox and return right away"""
+    subject, body = build_notification(summary)
+    recipients = get_recipients()
+    msg_id = enqueue(subject, body, recipients, FROM_EMAIL, FROM_HEADER, db_path=db_path)
+    print(f"✅ Queued notification {msg_id} for {len(recipients)} recipients")
+    return msg_id
+
+
+def flush_outbox(db_path=DEFAULT_OUTBOX_DB):
+    """Send everything pending in the outbox over one SMTP connection"""
+    sent, failed = OutboxWorker(SmtpSettings.from_env(), db_path=db_path).flush()
+    if failed:
+        print(f"⚠️  {pending_count(db_path)} notification(s) left in the outbox for the next flush")
+    print(f"✅ Flushed outbox: {sent} sent, {failed} failed")
+    return sent, failed
+
+
+def send_notification():
+    """Queue today's notification and flush the outbox"""
+    enqueue_notification()
+    return flush_outbox()
 
-        text = msg.as_string()
-        server.sendmail(from_email, recipients, text)
-        print("✅ Email notification sent successfully")
 
-    except Exception as e:
-        print(f"❌ Failed to send email: {str(e)}")
-        raise
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Queue and send the daily innovation sheet email')
+    parser.add_argument('--db', default=DEFAULT_OUTBOX_DB, help='Outbox SQLite file')
+    parser.add_argument('--flush', action='store_true',
+                        help='Only send what is already queued (e.g. by data_processing.py)')
+    parser.add_argument('--enqueue', action='store_true', help='Only queue, do not send')
+    return parser.parse_args(argv)
 
-    finally:
-        if server:
-            server.quit()
 
 if __name__ == "__main__":
-    send_notification()
+    args = parse_args()
+    if not args.flush:
+        enqueue_notification(db_path=args.db)
+    if not args.enqueue:
+        flush_outbox(db_path=args.db)
+    # A slow or failing relay must not fail the workflow; pending mail is retried next run
+    sys.exit(0)
@@ -0,0 +1,183 @@
+"""
+Column schema and payload serializer for the output tabs.
+
+Each tab declares a type per column. compile_serializer() turns that into a
+list of per-column converters once, and the serializer then builds the whole
+payload in a single pass: IDs become normalized strings, dates become ISO
+strings (or spreadsheet serial numbers), integral floats become ints and None
+becomes ''. Columns a tab does not declare fall back to AUTO.
+"""
+import math
+from datetime import date, datetime, time
+
+TEXT = 'text'
+ID = 'id'
+NUMBER = 'number'
+DATE = 'date'
+AUTO = 'auto'
+
+# Day zero of Google Sheets / Excel serial dates
+SERIAL_EPOCH = datetime(1899, 12, 30)
+
+TAB_SCHEMAS = {
+    'Data': {
+        'Expresso ID': ID, 'Campaign Name': TEXT, 'Package ID': ID, 'Package Name': TEXT,
+        'Advertiser': TEXT, 'Brand': TEXT, 'Geo Name': TEXT, 'Booking Type': TEXT,
+    },
+    'Configs': {
+        'Package ID': ID, 'Package Name': TEXT, 'Website': TEXT, 'Section': TEXT,
+        'Ad Unit Type': TEXT, 'Placement': TEXT,
+    },
+    'Sheet2': {
+        'Expresso ID': ID, 'Campaign Name': TEXT, 'Package ID': ID, 'Package Name': TEXT,
+        'Advertiser': TEXT, 'Brand': TEXT, 'Geo Name': TEXT, 'Website': TEXT,
+        'Section': TEXT, 'Ad Unit Type': TEXT, 'Placement': TEXT,
+    },
+    'Final_Innov_Details': {
+        'Expresso ID': ID, 'Campaign Name': TEXT, 'Package ID': ID, 'Package Name': TEXT,
+        'Imp. Commitment': NUMBER, 'Brand': TEXT, 'Geo Name': TEXT, 'Platform': TEXT,
+        'Publisher': TEXT, 'Section': TEXT, 'Ad Unit Type': TEXT, 'Placement': TEXT,
+    },
+}
+TAB_SCHEMAS['Config2'] = TAB_SCHEMAS['Configs']
+TAB_SCHEMAS['Final_Innov_Details_sorted'] = TAB_SCHEMAS['Final_Innov_Details']
+TAB_SCHEMAS['Final_Innov_Details_sorted| For Ops Reference'] = TAB_SCHEMAS['Final_Innov_Details']
+
+
+def normalize_id(val):
+    """Normalize IDs exported as 12345, 12345.0 or ' 12345 ' to '12345'"""
+    t = type(val)
+    if t is str:
+        s = val.strip()
+        # int() drops leading zeros like the float round-trip does; isdigit()
+        # alone would also let through non-ASCII digits int() converts
+        if s.isascii() and s.isdigit():
+            return str(int(s))
+    elif t is int:
+        return str(val)
+    elif t is float and val.is_integer():
+        return str(int(val))
+    # Uncommon inputs ('12345.0', None, NaN) take the slow path
+    try:
+        return str(int(float(val))).strip()
+    except (TypeError, ValueError, OverflowError):
+        return str(val).strip()
+
+
+def _date_iso(val):
+    if isinstance(val, datetime):
+        if val.time() == time.min:
+            return val.date().isoformat()
+        return val.isoformat(sep=' ')
+    return val.isoformat()
+
+
+def _date_serial(val):
+    if not isinstance(val, datetime):
+        val = datetime.combine(val, time.min)
+    serial = (val - SERIAL_EPOCH).total_seconds() / 86400
+    return int(serial) if serial.is_integer() else serial
+
+
+def _make_converters(date_format):
+    to_date = _date_serial if date_format == 'serial' else _date_iso
+
+    def auto(val):
+        t = type(val)
+        if t is str or t is int:
+            return val
+        if val is None:
+            return ''
+        if t is float:
+            return int(val) if val.is_integer() else val
+        if isinstance(val, (datetime, date)):
+            return to_date(val)
+        if isinstance(val, time):
+            return val.isoformat()
+        return val if isinstance(val, (bool, int, float)) else str(val)
+
+    def text(val):
+        if type(val) is str:
+            return val
+        val = auto(val)
+        return val if type(val) is str else str(val)
+
+    def ident(val):
+        return '' if val is None or val == '' else normalize_id(val)
+
+    def number(val):
+        if type(val) is str or val is None:
+            return '' if val is None else val
+        return auto(val)
+
+    def as_date(val):
+        return to_date(val) if isinstance(val, (datetime, date)) else auto(val)
+
+    return {TEXT: text, ID: ident, NUMBER: number, DATE: as_date, AUTO: auto}
+
+
+_compiled = {}
+
+
+def compile_serializer(sheet_name, headers, date_format='iso'):
+    """Return a function turning an iterable of rows into a Sheets-ready payload"""
+    key = (sheet_name, tuple(headers), date_format)
+    if key in _compiled:
+        return _compiled[key]
+
+    converters = _make_converters(date_format)
+    schema = TAB_SCHEMAS.get(sheet_name, {})
+    column_converters = [converters[schema.get(h, AUTO)] for h in headers]
+    width = len(column_converters)
+    auto = converters[AUTO]
+
+    def serialize(rows):
+        payload = []
+        append = payload.append
+        for row in rows:
+            if len(row) == width:
+                append([conv(v) for conv, v in zip(column_converters, row)])
+            else:
+                # Ragged rows: convert what the schema covers, AUTO the rest
+                out = [conv(v) for conv, v in zip(column_converters, row)]
+                out.extend(auto(v) for v in row[width:])
+                append(out)
+        return payload
+
+    _compiled[key] = serialize
+    return serialize
+
+
+def _parse_number(text):
+    """
+    '166000' -> 166000, '215.35' -> 215.35; anything that would not be written
+    back identically, or is not finite, stays text
+    """
+    try:
+        val = int(text)
+        if str(val) == text:
+            return val
+    except ValueError:
+        try:
+            val = float(text)
+            # 'nan'/'inf' round-trip too, but Sheets rejects non-finite numbers in JSON
+            if math.isfinite(val) and repr(val) == text:
+                return val
+        except ValueError:
+            pass
+    return text
+
+
+def parse_csv_rows(sheet_name, headers, rows):
+    """
+    Undo the CSV sink's stringification for a tab: numbers (and serial dates)
+    come back as numbers while TEXT and ID columns stay strings, so an upload
+    from CSV sends the same cell types as a direct Google Sheets run.
+    """
+    schema = TAB_SCHEMAS.get(sheet_name, {})
+    numeric = [schema.get(h, AUTO) not in (TEXT, ID) for h in headers]
+    width = len(numeric)
+    return [
+        [_parse_number(v) if v and (i >= width or numeric[i]) else v for i, v in enumerate(row)]
+        for row in rows
+    ]
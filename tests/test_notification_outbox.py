@@ -0,0 +1,198 @@
+"""
+Flush behaviour of notification_outbox.OutboxWorker against an in-process
+stand-in SMTP relay (no TLS, no login, no network access needed).
+
+    python -m unittest discover -s tests
+"""
+import os
+import socket
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notification_outbox as outbox  # noqa: E402
+
+
+class StandInRelay(socketserver.ThreadingTCPServer):
+    """
+    Minimal SMTP relay: refuses recipients containing 'bad' with 550 and
+    answers the first `busy_replies` MAIL FROM commands with 421.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, busy_replies=0):
+        super().__init__(('127.0.0.1', 0), SmtpHandler)
+        self.busy_replies = busy_replies
+        self.connections = 0
+        self.delivered = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def say(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+        self.wfile.flush()
+
+    def handle(self):
+        relay = self.server
+        with relay.lock:
+            relay.connections += 1
+        recipients = []
+        self.say('220 stand-in ready')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.upper()
+            if command.startswith(('EHLO', 'HELO', 'RSET', 'NOOP')):
+                self.say('250 ok')
+            elif command.startswith('MAIL'):
+                with relay.lock:
+                    busy = relay.busy_replies > 0
+                    relay.busy_replies -= busy
+                if busy:
+                    self.say('421 try again later')
+                    return
+                recipients = []
+                self.say('250 ok')
+            elif command.startswith('RCPT'):
+                if 'bad' in line:
+                    self.say('550 no such user')
+                else:
+                    recipients.append(line.split(':', 1)[1].strip('<> '))
+                    self.say('250 ok')
+            elif command == 'DATA':
+                self.say('354 end with .')
+                while self.rfile.readline().strip() != b'.':
+                    pass
+                with relay.lock:
+                    relay.delivered.append(recipients)
+                self.say('250 queued')
+            elif command == 'QUIT':
+                self.say('221 bye')
+                return
+            else:
+                self.say('502 not implemented')
+
+
+class OutboxFlushTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.relay = None
+
+    def tearDown(self):
+        if self.relay is not None:
+            self.relay.stop()
+        os.remove(self.db_path)
+
+    def queue(self, *recipient_lists):
+        return [
+            outbox.enqueue(f'subject {i}', 'body', recipients, 'from@example.com',
+                           'Sender <from@example.com>', db_path=self.db_path)
+            for i, recipients in enumerate(recipient_lists)
+        ]
+
+    def worker(self, port, timeout=1, **kwargs):
+        settings = outbox.SmtpSettings('127.0.0.1', port, starttls=False, timeout=timeout)
+        kwargs.setdefault('backoff', 0)
+        return outbox.OutboxWorker(settings, db_path=self.db_path, **kwargs)
+
+    def rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT id, status, attempts, last_error FROM outbox ORDER BY id').fetchall()
+        finally:
+            conn.close()
+
+    def test_sends_every_pending_message_over_one_connection(self):
+        self.relay = StandInRelay()
+        self.queue(['a@example.com'], ['b@example.com', 'c@example.com'])
+
+        self.assertEqual(self.worker(self.relay.port).flush(), (2, 0))
+        self.assertEqual(self.relay.connections, 1)
+        self.assertEqual(self.relay.delivered, [['a@example.com'], ['b@example.com', 'c@example.com']])
+        self.assertEqual([(status, attempts) for _, status, attempts, _ in self.rows()],
+                         [('sent', 1), ('sent', 1)])
+
+    def test_partially_refused_message_is_sent_with_refusals_recorded(self):
+        self.relay = StandInRelay()
+        self.queue(['a@example.com', 'bad@example.com'])
+
+        self.assertEqual(self.worker(self.relay.port).flush(), (1, 0))
+        (_, status, _, last_error), = self.rows()
+        self.assertEqual(status, 'sent')
+        self.assertIn('bad@example.com', last_error)
+        self.assertIn('550', last_error)
+
+    def test_fully_refused_message_does_not_block_the_queue(self):
+        self.relay = StandInRelay()
+        self.queue(['bad@example.com'], ['a@example.com'])
+
+        self.assertEqual(self.worker(self.relay.port).flush(), (1, 1))
+        refused, delivered = self.rows()
+        self.assertEqual(refused[1:3], ('pending', 1))
+        self.assertEqual(delivered[1], 'sent')
+        self.assertEqual(self.relay.delivered, [['a@example.com']])
+
+    def test_transient_reply_is_retried(self):
+        self.relay = StandInRelay(busy_replies=1)
+        self.queue(['a@example.com'])
+
+        self.assertEqual(self.worker(self.relay.port).flush(), (1, 0))
+        self.assertEqual(self.relay.connections, 2)
+        self.assertEqual(self.rows()[0][1], 'sent')
+
+    def test_relay_down_stops_the_flush_and_keeps_messages_pending(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self.queue(['a@example.com'], ['b@example.com'], ['c@example.com'])
+
+        self.assertEqual(self.worker(port).flush(), (0, 1))
+        self.assertEqual([(status, attempts) for _, status, attempts, _ in self.rows()],
+                         [('pending', 1), ('pending', 0), ('pending', 0)])
+
+    def test_silent_relay_times_out_once(self):
+        with socket.socket() as sock:
+            # Accepts connections into the backlog but never greets
+            sock.bind(('127.0.0.1', 0))
+            sock.listen(8)
+            self.queue(['a@example.com'], ['b@example.com'])
+
+            start = time.perf_counter()
+            self.assertEqual(self.worker(sock.getsockname()[1], timeout=0.5).flush(), (0, 1))
+            elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([status for _, status, _, _ in self.rows()], ['pending', 'pending'])
+
+    def test_message_fails_for_good_after_max_attempts(self):
+        self.relay = StandInRelay()
+        self.queue(['bad@example.com'])
+        for _ in range(2):
+            self.worker(self.relay.port, max_attempts=2).flush()
+
+        (_, status, attempts, _), = self.rows()
+        self.assertEqual((status, attempts), ('failed', 2))
+        self.assertEqual(outbox.pending_count(self.db_path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()